@@ -1,24 +1,93 @@
 """ Configuration for all things scrape. """
+from functools import lru_cache
 from logging import (
     config as loggingConfig,
     getLogger,
     )
 from os import path
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    Mapping,
+    )
 
 
-GENERAL = {
+# Settings are read-only views, edit the literals below to change them.
+GENERAL: Mapping[str, Any] = MappingProxyType({
     "THROTTLING_DELAY": (1, 3),  # Wait between 1 and 3 seconds
-    }
+    "CACHE_TTL": 24 * 60 * 60,  # Re-fetch cached pages after a day
+    "MAX_WORKERS": 4,  # Unit pages fetched at the same time
+    "REQUEST_TIMEOUT": (5, 30),  # Seconds to connect, and to read
+    })
 
-PRISMATA_WIKI = {
-    # Change BASE_URL to a URL to scrape from a site.
+PRISMATA_WIKI: Mapping[str, str] = MappingProxyType({
+    # Default source, a URL to scrape from a site. Overridden per call with
+    # fetch_units(base_url=...).
     "BASE_URL": "punter/scrape/files/wiki",  # "https://prismata.gamepedia.com"
     "UNITS_PATH": "/Unit",
     "SAVE_PATH": "punter/scrape/files/wiki",
+    "CACHE_PATH": "punter/scrape/files/cache",
+    "PARSED_CACHE_PATH": "punter/scrape/files/cache/parsed",
+    })
+
+# File handler "filename" defaults to <repo>/log when logging is initialized
+LOGGING: Dict[str, Any] = {
+    "version": 1,
+    "formatters": {
+        "simpleFormatter": {
+            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            },
+        },
+    "handlers": {
+        "consoleHandler": {
+            "class": "logging.StreamHandler",
+            "level": "DEBUG",
+            "formatter": "simpleFormatter",
+            "stream": "ext://sys.stdout",
+            },
+        "fileHandler": {
+            "class": "logging.FileHandler",
+            "level": "DEBUG",
+            "formatter": "simpleFormatter",
+            },
+        },
+    "loggers": {
+        "scrape": {
+            "level": "DEBUG",
+            "handlers": ["fileHandler"],
+            "propagate": False,
+            },
+        },
+    "root": {
+        "level": "DEBUG",
+        "handlers": ["consoleHandler"],
+        },
     }
 
-CURRENT_DIR = path.dirname(path.abspath(__file__))
-loggingConfig.fileConfig(
-    path.join(CURRENT_DIR, "../logging.conf"),
-    defaults={"logfilename": path.join(CURRENT_DIR, "../../log")})
-LOGGER = getLogger("scrape")
+
+@lru_cache(maxsize=1)
+def _init_logging() -> None:
+    """ Apply logging configuration, only the first call does any work. """
+    LOGGING["handlers"]["fileHandler"].setdefault(
+        "filename", path.join(__getattr__("CURRENT_DIR"), "../../log"))
+    loggingConfig.dictConfig(LOGGING)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Lazily create module attributes on first access (PEP 562).
+
+    CURRENT_DIR and LOGGER are only computed when needed, so importing
+    the settings alone does not touch the filesystem or configure logging.
+
+    """
+    if name == "CURRENT_DIR":
+        value: Any = path.dirname(path.abspath(__file__))
+    elif name == "LOGGER":
+        _init_logging()
+        value = getLogger("scrape")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
@@ -0,0 +1,245 @@
+""" Export of scraped data into files. """
+import csv
+import json
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Tuple,
+    Union,
+    )
+
+try:
+    import orjson
+except ImportError:  # Optional, exports fall back to the json module
+    orjson = None  # type: ignore  # pylint: disable=invalid-name
+
+from punter.scrape.config import (  # pylint: disable=no-name-in-module
+    LOGGER as logger,
+    )
+from punter.scrape.utils import atomic_open
+
+# Columns of the CSV export. For ordering purposes, using an explicit list
+# instead of the keys of the first unit
+CSV_HEADERS = (
+    'name', 'supply', 'type', 'position', 'unit_spell',
+    'gold', 'blue', 'red', 'green', 'energy',
+    'attack', 'health', 'blocker', 'fragile',
+    'frontline', 'prompt', 'lifespan', 'stamina',
+    'build_time', 'exhaust_ability', 'exhaust_turn',
+    'abilities', 'path', 'image', 'panel',
+    'change_history',
+    )
+
+
+def export_units_json(
+        data: Dict[str, Dict[str, Union[str, int]]],
+        file_name: str = "units.json"
+        ) -> Dict[str, str]:
+    """
+    Save data into .json format/file.
+
+    Parameters
+    ----------
+    data : dict
+        Data to export. See Example for expected format.
+    file_name : str, defaults to  "units.json"
+        Path of file to save.
+
+    Returns
+    -------
+    dict
+
+    Example
+    -------
+    input:
+        {
+            "Unit Name":
+                {
+                    "name": "Unit name",
+                    "costs": {
+                        "gold": 1,
+                        "energy": 0,
+                        "green": 1,
+                        "blue": 0,
+                        "red": 1,
+                        },
+                    "stats": {
+                        "attack": 1,
+                        "health": 1,
+                        },
+                    "attributes": {
+                        "supply": 1,
+                        "frontline": True,
+                        "fragile": False,
+                        "blocker": True,
+                        "prompt": False,
+                        "stamina": 0,
+                        "lifespan": 0,
+                        "build_time": 0,
+                        "exhaust_turn": 0,
+                        "exhaust_ability": 0,
+                        },
+                    "links": {
+                        "path": "/Unit_Name",
+                        },
+                    "type": 1,
+                    "unit_spell": "Unit|Spell",
+                },
+            ...
+        }
+
+    """
+    if orjson:
+        # pylint: disable=no-member
+        # Already utf-8 encoded bytes, written as is
+        with open(file_name, "wb") as out_file:
+            out_file.write(orjson.dumps(
+                data, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2))
+    else:
+        # Streamed to the file, without building the whole str first
+        with open(file_name, "w", encoding="utf-8") as out_file:
+            json.dump(
+                data, out_file, sort_keys=True, indent=2,
+                separators=(",", ": "), ensure_ascii=False)
+
+    logger.info("Data exported to (JSON): %s", file_name)
+    return {"message": "Success"}
+
+
+def _csv_rows(
+        data: Dict[str, MutableMapping[str, Mapping[str, Iterable[str]]]]
+        ) -> Iterator[Tuple[Any, ...]]:
+    """
+    Flatten units into CSV rows, see export_units_csv.
+
+    Parameters
+    ----------
+    data : dict
+        Data to export.
+
+    Yields
+    ------
+    tuple
+        One row per unit, values in CSV_HEADERS order ("" when missing).
+
+    Raises
+    ------
+    AttributeError
+        When a unit, or its change_history, isn't a mapping.
+    KeyError
+        When a unit is missing nested data.
+
+    """
+    nested = ("attributes", "costs", "links", "stats")
+    for val in data.values():
+        if not isinstance(val, Mapping):  # Reported as nested data
+            raise AttributeError(f"Unit data is not a mapping: {val!r}")
+        # Built from val by key access, data is left as it was
+        unit: MutableMapping[str, Any] = {}
+        for key in nested:
+            unit.update(val[key])
+        unit["change_history"] = "|".join(
+            f"{day}, {' '.join(change)}"
+            for day, change in val["change_history"].items())
+        unit.update(
+            (key, value) for key, value in val.items()
+            if key not in nested and key != "change_history")
+        yield tuple(unit.get(header, "") for header in CSV_HEADERS)
+
+
+def export_units_csv(
+        data: Dict[str, MutableMapping[str, Mapping[str, Iterable[str]]]],
+        file_name: str = "units.csv"
+        ) -> Dict[str, str]:
+    """
+    Save data into .csv format/file.
+
+    Parameters
+    ----------
+    data : dict
+        Data to export. See Example for expected format.
+    file_name : str, defaults to  "units.csv"
+        Path of file to save.
+
+    Returns
+    -------
+    dict
+
+    Example
+    -------
+    input:
+        {
+            "Unit Name":
+                {
+                    "abilities": "",
+                    "attributes": {
+                        "blocker": false,
+                        "build_time": 0,
+                        "exhaust_ability": 0,
+                        "exhaust_turn": 0,
+                        "fragile": false,
+                        "frontline": false,
+                        "lifespan": 0,
+                        "prompt": false,
+                        "stamina": 0,
+                        "supply": 0,
+                    },
+                    "change_history": {
+                        "Month 00st, YEAR": [
+                                "",
+                                ...
+                            ],
+                        ...
+                        },
+                    "costs": {
+                        "blue": 0,
+                        "energy": 0,
+                        "gold": 0,
+                        "green": 0,
+                        "red": 0,
+                    },
+                    "links": {
+                        "image": "",
+                        "panel": "",
+                        "path": "",
+                    },
+                    "name": "",
+                    "position": "",
+                    "stats": {
+                        "attack": 0,
+                        "health": 0,
+                    },
+                    "type": 0,
+                    "unit_spell": "",
+                },
+                ...
+        }
+
+    output:
+    False, {"message": "Error message"}
+    True, {"message": "Success message"}
+
+    """
+    try:
+        # Rows are streamed, the file only replaces file_name on success
+        with atomic_open(
+                file_name, "w", encoding="utf-8", newline="",
+                buffering=1 << 20) as out_file:
+            writer = csv.writer(out_file)
+            writer.writerow(CSV_HEADERS)
+            writer.writerows(_csv_rows(data))
+    except AttributeError:
+        message = "Invalid format (nested data)."
+        logger.error("Error exporting CSV: %s", message)
+        return {"message": message}
+    except KeyError:
+        message = "Invalid format (missing key)."
+        logger.error("Error exporting CSV: %s", message)
+        return {"message": message}
+
+    logger.info("Data exported to (CSV): %s", file_name)
+    return {"message": "Success"}
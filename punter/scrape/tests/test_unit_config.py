@@ -1,5 +1,11 @@
 """ Test for scrape.config module. """
+import os
 import unittest
+from unittest.mock import (
+    patch,
+    )
+
+from punter.scrape import config
 from punter.scrape.config import (
     GENERAL,
     PRISMATA_WIKI,
@@ -13,9 +19,16 @@ class VariablesCleanTests(unittest.TestCase):
         """ Tests variables for GENERAL. """
         # Given
         expected_delay = (1, 3)
+        expected_cache_ttl = 86400
+        expected_max_workers = 4
+        expected_request_timeout = (5, 30)
 
         # Then
         self.assertEqual(GENERAL["THROTTLING_DELAY"], expected_delay)
+        self.assertEqual(GENERAL["CACHE_TTL"], expected_cache_ttl)
+        self.assertEqual(GENERAL["MAX_WORKERS"], expected_max_workers)
+        self.assertEqual(
+            GENERAL["REQUEST_TIMEOUT"], expected_request_timeout)
 
     def test_pw_variables(self):
         """ Tests variables for PRISMATA_WIKI. """
@@ -23,8 +36,76 @@ class VariablesCleanTests(unittest.TestCase):
         expected_base_url = "punter/scrape/files/wiki"
         expepcted_units_path = "/Unit"
         expepcted_save_path = "punter/scrape/files/wiki"
+        expected_cache_path = "punter/scrape/files/cache"
+        expected_parsed_cache_path = "punter/scrape/files/cache/parsed"
 
         # Then
         self.assertEqual(PRISMATA_WIKI["BASE_URL"], expected_base_url)
         self.assertEqual(PRISMATA_WIKI["UNITS_PATH"], expepcted_units_path)
         self.assertEqual(PRISMATA_WIKI["SAVE_PATH"], expepcted_save_path)
+        self.assertEqual(PRISMATA_WIKI["CACHE_PATH"], expected_cache_path)
+        self.assertEqual(
+            PRISMATA_WIKI["PARSED_CACHE_PATH"], expected_parsed_cache_path)
+
+    def test_read_only(self):
+        """ Tests settings can't be changed at runtime. """
+        # Then
+        with self.assertRaises(TypeError):
+            GENERAL["THROTTLING_DELAY"] = (0, 0)
+        with self.assertRaises(TypeError):
+            PRISMATA_WIKI["BASE_URL"] = "http://example.com"
+
+
+class InitLoggingCleanTests(unittest.TestCase):
+    """ Tests for success cases for scrape.config._init_logging. """
+    # pylint: disable=protected-access
+
+    def tearDown(self):
+        config._init_logging.cache_clear()
+
+    @patch("punter.scrape.config.loggingConfig.dictConfig")
+    def test_configured_once(self, dict_config_mock):
+        """ Tests logging configuration is only applied once. """
+        # Given
+        config._init_logging.cache_clear()
+
+        # When
+        config._init_logging()
+        config._init_logging()
+
+        # Then
+        dict_config_mock.assert_called_once_with(config.LOGGING)
+
+
+class GetAttrCleanTests(unittest.TestCase):
+    """ Tests for success cases for scrape.config lazy attributes. """
+
+    def test_logger(self):
+        """ Tests LOGGER is created on first access and kept. """
+        # When
+        result = config.LOGGER
+
+        # Then
+        self.assertEqual(result.name, "scrape")
+        self.assertIs(vars(config)["LOGGER"], result)
+
+    def test_current_dir(self):
+        """ Tests CURRENT_DIR points to the config module directory. """
+        # Given
+        expected_result = os.path.dirname(os.path.abspath(config.__file__))
+
+        # When
+        result = config.CURRENT_DIR
+
+        # Then
+        self.assertEqual(result, expected_result)
+
+
+class GetAttrDirtyTests(unittest.TestCase):
+    """ Tests for error cases for scrape.config lazy attributes. """
+
+    def test_unknown_attribute(self):
+        """ Tests unknown attributes still raise AttributeError. """
+        # Then
+        with self.assertRaises(AttributeError):
+            config.UNKNOWN  # pylint: disable=pointless-statement
@@ -0,0 +1,148 @@
+""" Test for scrape.export module. """
+import copy
+import csv
+import json
+import logging
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from unittest.mock import (
+    mock_open,
+    patch,
+    )
+
+from punter.scrape.export import (
+    export_units_csv,
+    export_units_json,
+    )
+from punter.scrape.tests.test_unit_wiki import UNIT_DATA
+
+
+logging.disable()
+
+
+class ExportUnitsJsonCleanTests(unittest.TestCase):
+    """ Tests success cases for scrape.export.export_units_json. """
+
+    def setUp(self):
+        self.file_name = "units.json.test"
+        self.data = UNIT_DATA
+
+    @patch("builtins.open", new_callable=mock_open)
+    def test_success(self, open_mock):
+        """ Tests json file is saved when valid format is provided. """
+        # Given
+        expected_result = {"message": "Success"}
+
+        # When
+        result = export_units_json(self.data, file_name=self.file_name)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        open_mock.assert_called_once_with(self.file_name, "wb")
+        (json_data,), _ = open_mock().write.call_args
+        self.assertEqual(json.loads(json_data), self.data)
+
+    @patch("punter.scrape.export.orjson", None)
+    @patch("builtins.open", new_callable=mock_open)
+    def test_success_json(self, open_mock):
+        """ Tests json module is used when orjson isn't installed. """
+        # Given
+        json_data = json.dumps(
+            self.data, sort_keys=True, indent=2, separators=(",", ": "),
+            ensure_ascii=False)
+        expected_result = {"message": "Success"}
+
+        # When
+        result = export_units_json(self.data, file_name=self.file_name)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        open_mock.assert_called_once_with(
+            self.file_name, "w", encoding="utf-8")
+        self.assertEqual(
+            "".join(
+                args[0] for args, _ in open_mock().write.call_args_list),
+            json_data)
+
+
+class ExportUnitsCsvDirtyTests(unittest.TestCase):
+    """ Tests error cases for scrape.export.export_units_csv. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(tmp_dir, "units.csv.test")
+
+    def test_invalid_format(self):
+        """ Tests error when invalid data format is provided. """
+        cases = (
+            ({"bad": "wrong"}, "Invalid format (nested data)."),
+            ({"bad": {}}, "Invalid format (missing key)."),
+            )
+        for data, message in cases:
+            with self.subTest(data=data):
+                # Given
+                expected_result = {"message": message}
+
+                # When
+                result = export_units_csv(data, file_name=self.file_name)
+
+                # Then
+                self.assertEqual(result, expected_result)
+                self.assertFalse(os.path.isfile(self.file_name))
+
+    def test_unexpected_error(self):
+        """ Tests unexpected errors aren't reported as invalid format. """
+        # Given
+        data = copy.deepcopy(UNIT_DATA)
+        data["name"]["change_history"] = {"May 1st, 1984": [1, 2]}
+
+        # When/Then
+        with self.assertRaises(TypeError):
+            export_units_csv(data, file_name=self.file_name)
+        self.assertFalse(os.path.isfile(self.file_name))
+
+
+class ExportUnitsCsvCleanTests(unittest.TestCase):
+    """ Tests success cases for scrape.export.export_units_csv. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(tmp_dir, "units.csv.test")
+
+    def test_success(self):
+        """ Tests csv file is saved when valid format is provided. """
+        # Given
+        data = copy.deepcopy(UNIT_DATA)
+        data["name"]["change_history"] = {
+            "May 1st, 1984": ["Change1", "Change2"],
+            }
+        expected_result = {"message": "Success"}
+
+        expected_row = {
+            "name": "name", "supply": "8", "type": "1", "position": "",
+            "unit_spell": "unit/spell", "gold": "3", "blue": "6",
+            "red": "7", "green": "5", "energy": "4", "attack": "15",
+            "health": "10", "blocker": "True", "fragile": "False",
+            "frontline": "True", "prompt": "False", "lifespan": "19",
+            "stamina": "16", "build_time": "9", "exhaust_ability": "18",
+            "exhaust_turn": "17", "abilities": "", "path": "/name",
+            "image": "", "panel": "",
+            "change_history": "May 1st, 1984, Change1 Change2",
+            }
+
+        expected_data = copy.deepcopy(data)
+
+        # When
+        result = export_units_csv(data, file_name=self.file_name)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertEqual(data, expected_data)  # Input isn't modified
+        with open(self.file_name, encoding="utf-8", newline="") as csv_file:
+            self.assertEqual(list(csv.DictReader(csv_file)), [expected_row])
@@ -1,48 +1,402 @@
 """ Test for scrape.utils module. """
+import os
+import tempfile
+import time
 import unittest
-from mock import (
+from contextlib import ExitStack
+from unittest.mock import (
+    Mock,
+    call,
+    mock_open,
     patch,
     )
 
 from punter.scrape.utils import (
+    atomic_open,
+    cache_path,
     delay,
+    read_cached,
+    read_json,
+    read_text,
+    throttle,
+    write_cached,
+    write_json,
     )
 
 
 class DelayCleanTests(unittest.TestCase):
     """ Tests for successful calls to scrape.utils.delay function. """
 
-    @patch("punter.scrape.utils.sleep")
-    @patch("punter.scrape.utils.uniform")
-    def test_no_params(self, random_mock, sleep_mock):
+    def setUp(self):
+        self.random_mock = Mock()
+        self.sleep_mock = Mock()
+
+    def test_no_params(self):
         """ Tests when no params are provided. """
         # Given
         expected_result = 1.5
 
-        random_mock.return_value = expected_result
+        self.random_mock.return_value = expected_result
 
         # When
-        result = delay()
+        result = delay(_uniform=self.random_mock, _sleep=self.sleep_mock)
 
         # Then
         self.assertEqual(result, expected_result)
-        random_mock.assert_called_once_with(1, 3)
-        sleep_mock.assert_called_once_with(expected_result)
+        self.random_mock.assert_called_once_with(1, 3)
+        self.sleep_mock.assert_called_once_with(expected_result)
 
-    @patch("punter.scrape.utils.sleep")
-    @patch("punter.scrape.utils.uniform")
-    def test_params(self, random_mock, sleep_mock):
+    def test_params(self):
         """ Tests when params are provided. """
         # Given
         param = (2, 4)
         expected_result = 2.8
 
-        random_mock.return_value = expected_result
+        self.random_mock.return_value = expected_result
+
+        # When
+        result = delay(
+            secs=param, _uniform=self.random_mock, _sleep=self.sleep_mock)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.random_mock.assert_called_once_with(param[0], param[1])
+        self.sleep_mock.assert_called_once_with(expected_result)
+
+
+class ThrottleCleanTests(unittest.TestCase):
+    """ Tests for successful calls to scrape.utils.throttle function. """
+
+    def setUp(self):
+        patcher = patch.dict("punter.scrape.utils._NEXT_REQUEST", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.random_mock = Mock(return_value=2)
+        self.sleep_mock = Mock()
+        self.clock_mock = Mock()
+
+    def test_first(self):
+        """ Tests first request for a key does not wait. """
+        # Given
+        expected_result = 0
+
+        self.clock_mock.return_value = 10
+
+        # When
+        result = throttle(
+            "host", (1, 3), self.random_mock, self.sleep_mock,
+            self.clock_mock)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.random_mock.assert_called_once_with(1, 3)
+        self.assertFalse(self.sleep_mock.called)
+
+    def test_consecutive(self):
+        """ Tests requests for the same key wait for the previous ones. """
+        # Given
+        expected_result = [0, 1.5, 3.5]
+
+        self.clock_mock.side_effect = [10, 10.5, 10.5]
+
+        # When
+        result = [
+            throttle(
+                "host", (1, 3), self.random_mock, self.sleep_mock,
+                self.clock_mock)
+            for _ in range(3)
+            ]
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.sleep_mock.assert_has_calls([call(1.5), call(3.5)])
+
+    def test_elapsed(self):
+        """ Tests no wait when the delay already elapsed. """
+        # Given
+        expected_result = [0, 0]
+
+        self.clock_mock.side_effect = [10, 13]
+
+        # When
+        result = [
+            throttle(
+                "host", (1, 3), self.random_mock, self.sleep_mock,
+                self.clock_mock)
+            for _ in range(2)
+            ]
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertFalse(self.sleep_mock.called)
+
+    def test_keys(self):
+        """ Tests keys are throttled independently. """
+        # Given
+        expected_result = [0, 0]
+
+        self.clock_mock.return_value = 10
+
+        # When
+        result = [
+            throttle(
+                key, (1, 3), self.random_mock, self.sleep_mock,
+                self.clock_mock)
+            for key in ("host1", "host2")
+            ]
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertFalse(self.sleep_mock.called)
+
+
+class CachePathCleanTests(unittest.TestCase):
+    """ Tests for successful calls to scrape.utils.cache_path function. """
+
+    def test_path(self):
+        """ Tests file is named after the SHA1 digest of the key. """
+        # Given
+        key = "http://example.com"
+        expected_result = os.path.join(
+            "/cache", "89dce6a446a69d6b9bdc01ac75251e4c322bcdff")
+
+        # When
+        result = cache_path(key, "/cache")
+
+        # Then
+        self.assertEqual(result, expected_result)
+
+
+class ReadCachedDirtyTests(unittest.TestCase):
+    """ Tests for error cases for scrape.utils.read_cached function. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self.tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(self.tmp_dir, "cached")
+
+    def test_missing(self):
+        """ Tests result when cache file doesn't exist. """
+        # When
+        result = read_cached(self.file_name)
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_expired(self):
+        """ Tests result when cache file is older than max_age. """
+        # Given
+        write_cached(self.file_name, "<html></html>")
+        old = time.time() - 100
+        os.utime(self.file_name, (old, old))
+
+        # When
+        result = read_cached(self.file_name, max_age=10)
+
+        # Then
+        self.assertIsNone(result)
+
+
+class ReadWriteCachedCleanTests(unittest.TestCase):
+    """ Tests for success cases for scrape.utils cache functions. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self.tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(self.tmp_dir, "sub", "cached")
+
+    def test_round_trip(self):
+        """ Tests written content is read back while fresh. """
+        # Given
+        expected_result = "<html>\u00e9</html>"
 
         # When
-        result = delay(secs=param)
+        write_cached(self.file_name, expected_result)
+        result = read_cached(self.file_name, max_age=10)
 
         # Then
         self.assertEqual(result, expected_result)
-        random_mock.assert_called_once_with(param[0], param[1])
-        sleep_mock.assert_called_once_with(expected_result)
+        self.assertEqual(os.listdir(os.path.dirname(self.file_name)), [
+            "cached"])
+
+    def test_stale(self):
+        """ Tests old content is read when no max_age is provided. """
+        # Given
+        expected_result = "<html></html>"
+        write_cached(self.file_name, expected_result)
+        old = time.time() - 100
+        os.utime(self.file_name, (old, old))
+
+        # When
+        result = read_cached(self.file_name)
+
+        # Then
+        self.assertEqual(result, expected_result)
+
+
+class ReadTextCleanTests(unittest.TestCase):
+    """ Tests for successful calls to scrape.utils.read_text function. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(tmp_dir, "page.html")
+
+    def test_small(self):
+        """ Tests reading a file smaller than mmap_size. """
+        # Given
+        expected_result = "<html>\u00e9</html>"
+        with open(self.file_name, "w", encoding="utf-8") as test_file:
+            test_file.write(expected_result)
+
+        # When
+        result = read_text(self.file_name)
+
+        # Then
+        self.assertEqual(result, expected_result)
+
+    def test_mapped(self):
+        """ Tests reading a file of at least mmap_size (memory mapped). """
+        # Given
+        expected_result = "<html>" + "\u00e9" * 10 + "</html>"
+        with open(self.file_name, "w", encoding="utf-8") as test_file:
+            test_file.write(expected_result)
+
+        # When
+        result = read_text(self.file_name, mmap_size=1)
+
+        # Then
+        self.assertEqual(result, expected_result)
+
+
+class ReadWriteJsonTests(unittest.TestCase):
+    """ Tests for scrape.utils.read_json and write_json functions. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(tmp_dir, "parsed", "key")
+
+    def test_round_trip(self):
+        """ Tests objects written are read back. """
+        # Given
+        expected_result = {
+            "unit": {"name": "Unit\u00e9", "costs": {"gold": 1}},
+            "flags": [True, False, None],
+            }
+
+        # When
+        write_json(self.file_name, expected_result)
+        result = read_json(self.file_name)
+
+        # Then
+        self.assertEqual(result, expected_result)
+
+    def test_missing(self):
+        """ Tests missing files read as None. """
+        # When
+        result = read_json(self.file_name)
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_corrupt(self):
+        """ Tests files that aren't valid JSON read as None. """
+        # Given
+        os.makedirs(os.path.dirname(self.file_name))
+        with open(self.file_name, "wb") as test_file:
+            test_file.write(b"\x80not json")
+
+        # When
+        result = read_json(self.file_name)
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_write_error(self):
+        """ Tests write errors are raised to the caller. """
+        # Given
+        os.makedirs(os.path.dirname(self.file_name))
+        with open(self.file_name, "w", encoding="utf-8") as test_file:
+            test_file.write("{}")
+
+        # When/Then
+        with self.assertRaises(OSError):
+            write_json(os.path.join(self.file_name, "nested"), {})
+
+
+class AtomicOpenCleanTests(unittest.TestCase):
+    """ Tests for success cases for scrape.utils.atomic_open function. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self.tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(self.tmp_dir, "out.csv")
+
+    def test_success(self):
+        """ Tests file is in place once the context exits. """
+        # Given
+        expected_result = "a,b\n"
+
+        # When
+        with atomic_open(self.file_name) as out_file:
+            out_file.write(expected_result)
+            self.assertFalse(os.path.isfile(self.file_name))
+
+        # Then
+        with open(self.file_name, encoding="utf-8") as in_file:
+            self.assertEqual(in_file.read(), expected_result)
+        self.assertEqual(os.listdir(self.tmp_dir), ["out.csv"])
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("punter.scrape.utils.replace")
+    def test_encoding(self, replace_mock, open_mock):
+        """ Tests text modes default to utf-8, binary modes to no encoding. """
+        cases = (
+            ("w", {}, "utf-8"),
+            ("w", {"encoding": "latin-1"}, "latin-1"),
+            ("wb", {}, None),
+            ("wb", {"encoding": "utf-8"}, None),
+            )
+        for mode, options, expected_encoding in cases:
+            with self.subTest(mode=mode, options=options):
+                # When
+                with atomic_open(self.file_name, mode, **options):
+                    pass
+
+                # Then
+                _, kwargs = open_mock.call_args
+                self.assertEqual(kwargs, {"encoding": expected_encoding})
+                self.assertTrue(replace_mock.called)
+
+
+class AtomicOpenDirtyTests(unittest.TestCase):
+    """ Tests for error cases for scrape.utils.atomic_open function. """
+
+    def setUp(self):
+        stack = ExitStack()
+        self.addCleanup(stack.close)
+        self.tmp_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        self.file_name = os.path.join(self.tmp_dir, "out.csv")
+
+    def test_error(self):
+        """ Tests nothing is left behind when writing fails. """
+        # Given
+        with open(self.file_name, "w", encoding="utf-8") as out_file:
+            out_file.write("old")
+
+        # When
+        with self.assertRaises(KeyError):
+            with atomic_open(self.file_name) as out_file:
+                out_file.write("partial")
+                raise KeyError("bad")
+
+        # Then
+        with open(self.file_name, encoding="utf-8") as in_file:
+            self.assertEqual(in_file.read(), "old")
+        self.assertEqual(os.listdir(self.tmp_dir), ["out.csv"])
@@ -1,24 +1,24 @@
-""" Test for scrape.wiki module. """
-import json
+""" Test for scrape.wiki module (parsing). """
 import logging
-import os
 import unittest
-from mock import (
+from unittest.mock import (
     call,
     MagicMock,
+    Mock,
     patch,
     )
 
-from punter.scrape import config
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from punter.scrape import wiki
 from punter.scrape.wiki import (
     clean,
     clean_changes,
     clean_change_log,
     clean_symbols,
-    export_units_csv,
-    export_units_json,
-    fetch_units,
-    get_content,
+    clean_text,
+    symbol_text,
     unit_to_dict,
     unit_table_to_dict,
     )
@@ -26,111 +26,81 @@ from punter.scrape.wiki import (
 
 logging.disable()
 
-
-class GetContentDirtyTests(unittest.TestCase):
-    """ Tests for error cases for scrape.wiki.get_content. """
-
-    @patch("punter.scrape.wiki.requests.get")
-    def test_error(self, requests_mock):
-        """ Tests response when request is not successfull. """
+# Unit as parsed by unit_table_to_dict, shared with the export tests
+UNIT_DATA = {
+    "name": {
+        "name": "name",
+        "costs": {
+            "gold": 3,
+            "energy": 4,
+            "green": 5,
+            "blue": 6,
+            "red": 7,
+            },
+        "stats": {
+            "attack": 15,
+            "health": 10,
+            },
+        "attributes": {
+            "supply": 8,
+            "frontline": True,
+            "fragile": False,
+            "blocker": True,
+            "prompt": False,
+            "stamina": 16,
+            "lifespan": 19,
+            "build_time": 9,
+            "exhaust_turn": 17,
+            "exhaust_ability": 18,
+            },
+        "links": {
+            "path": "/name",
+            },
+        "type": 1,
+        "unit_spell": "unit/spell",
+        }
+    }
+
+
+class HtmlParserCleanTests(unittest.TestCase):
+    """ Tests for scrape.wiki.HTML_PARSER. """
+
+    def test_lxml(self):
+        """ Tests lxml is used when installed, html.parser otherwise. """
         # Given
-        url = "http://example.com"
-        expected_result = ""
-
-        requests_mock.return_value = MagicMock(status_code=400)
-
-        # When
-        result = get_content(url)
+        expected_result = (
+            "lxml" if builder_registry.lookup("lxml") else "html.parser")
 
         # Then
-        self.assertEqual(result, expected_result)
-        requests_mock.assert_called_once_with(url)
-
-
-class GetContentCleanTests(unittest.TestCase):
-    """ Tests for success cases for scrape.wiki.get_content. """
-
-    @patch("punter.scrape.wiki.requests.get")
-    def test_success(self, requests_mock):
-        """ Tests response when request is successfull. """
-        # Given
-        url = "http://example.com"
-        expected_result = "<html></html>"
-
-        requests_mock.return_value = MagicMock(
-            status_code=200,
-            content=expected_result,
-            )
+        self.assertEqual(wiki.HTML_PARSER, expected_result)
 
-        # When
-        result = get_content(url)
 
-        # Then
-        self.assertEqual(result, expected_result)
-        requests_mock.assert_called_once_with(url)
+class CleanTextCleanTests(unittest.TestCase):
+    """ Tests for success cases for scrape.wiki.clean_text. """
 
-    @patch("punter.scrape.wiki.BeautifulSoup")
-    @patch("builtins.open")
-    @patch("punter.scrape.wiki.requests.get")
-    def test_save(self, requests_mock, open_mock, soup_mock):
-        """ Tests saving of content when request is successfull. """
+    def test_whitespace(self):
+        """ Tests whitespace runs are collapsed and ends stripped. """
         # Given
-        url = "http://example.com"
-        expected_result = "<html></html>"
-
-        requests_mock.return_value = MagicMock(
-            status_code=200,
-            content=expected_result,
-            )
-        open_mock.return_value = open_mock
-        soup_mock.return_value = soup_mock
-        soup_mock.prettify.return_value = expected_result
+        data = " \n some\n\t change \n "
+        expected_result = "some change"
 
         # When
-        result = get_content(url, save_file=True)
+        result = clean_text(data)
 
         # Then
         self.assertEqual(result, expected_result)
-        requests_mock.assert_called_once_with(url)
-        open_mock.assert_has_calls([
-            call(url, "w"),
-            call.__enter__(),
-            call.__enter__().write(expected_result),
-            call.__exit__(None, None, None),
-            ])
-        soup_mock.assert_has_calls([
-            call(expected_result, "html.parser"),
-            call.prettify(),
-            ])
 
-    @patch("builtins.open")
-    @patch("os.path.isfile")
-    @patch("punter.scrape.wiki.requests.get")
-    def test_read_from_file(self, requests_mock, isfile_mock, open_mock):
-        """ Tests content when file exists (instead of calling url). """
+    def test_no_whitespace(self):
+        """ Tests text without extra whitespace is kept as is. """
         # Given
-        path = "/path/to/file.html"
-        file_mock = MagicMock()
-        expected_result = "<html></html>"
-
-        isfile_mock.return_value = True
-        open_mock.return_value = open_mock
-        open_mock.__enter__.return_value = file_mock
-        file_mock.read.return_value = expected_result
+        data = "Gain 1 X."
+        expected_result = data
 
         # When
-        result = get_content(path)
+        result = clean_text(data)
 
         # Then
         self.assertEqual(result, expected_result)
-        self.assertFalse(requests_mock.called)
-        open_mock.assert_has_calls([
-            call(path, "r"),
-            call.__enter__(),
-            call.__enter__().read(),
-            call.__exit__(None, None, None),
-            ])
-        file_mock.read.assert_called_once_with()
 
 
 class CleanCleanTests(unittest.TestCase):
@@ -139,7 +109,7 @@ class CleanCleanTests(unittest.TestCase):
     def test_div(self):
         """ Tests result when input data has a div value. """
         # Given
-        data = MagicMock(div=MagicMock(text="abc", img=None))
+        data = Mock(div=Mock(text="abc", img=None))
         expected_result = "abc"
 
         # When
@@ -151,7 +121,7 @@ class CleanCleanTests(unittest.TestCase):
     def test_int(self):
         """ Tests result when input data is a string number. """
         # Given
-        data = MagicMock(div=None, text=" \n 999 \n ", img=None)
+        data = Mock(div=None, text=" \n 999 \n ", img=None)
         expected_result = 999
 
         # When
@@ -163,7 +133,7 @@ class CleanCleanTests(unittest.TestCase):
     def test_img(self):
         """ Tests result when input data has an img tag. """
         # Given
-        data = MagicMock(div=None, img="some image")
+        data = Mock(div=None, img="some image")
         expected_result = True
 
         # When
@@ -172,6 +142,26 @@ class CleanCleanTests(unittest.TestCase):
         # Then
         self.assertEqual(result, expected_result)
 
+    def test_tags(self):
+        """ Tests result for single string, mixed and comment only cells. """
+        cells = (
+            ("<td> \n Drone \n </td>", "Drone"),
+            ("<td><b> Blood </b>Pact </td>", "Blood Pact"),
+            ("<td><!-- hidden --></td>", ""),
+            )
+        for html, expected_result in cells:
+            with self.subTest(html=html):
+                # Given
+                data = BeautifulSoup(
+                    f"<table><tr>{html}</tr></table>", wiki.HTML_PARSER).td
+
+                # When
+                result = clean(data)
+
+                # Then
+                self.assertEqual(result, expected_result)
+                self.assertIs(type(result), str)
+
 
 class UnitTableToDictDirtyTests(unittest.TestCase):
     """ Tests error cases for scrape.wiki.unit_table_to_dict. """
@@ -183,14 +173,29 @@ class UnitTableToDictDirtyTests(unittest.TestCase):
         data = ""
         expected_result = {}
 
-        soup_mock.return_value = MagicMock(table=None)
+        # When
+        result = unit_table_to_dict(data)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        soup_mock.assert_not_called()
+
+    @patch("punter.scrape.wiki.BeautifulSoup")
+    def test_no_table_found(self, soup_mock):
+        """ Tests result when input data has a table the strainer skips. """
+        # Given
+        data = "<html><!-- <table> --></html>"
+        expected_result = {}
+
+        soup_mock.return_value = Mock(table=None)
 
         # When
         result = unit_table_to_dict(data)
 
         # Then
         self.assertEqual(result, expected_result)
-        soup_mock.assert_called_once_with(data, "html.parser")
+        soup_mock.assert_called_once_with(
+            data, wiki.HTML_PARSER, parse_only=wiki.TABLE_STRAINER)
 
 
 class UnitTableToDictCleanTests(unittest.TestCase):
@@ -204,8 +209,9 @@ class UnitTableToDictCleanTests(unittest.TestCase):
         expected_dict = {}
         expected_result = expected_dict
 
-        row_mock = MagicMock()
-        soup_mock.return_value = MagicMock()
+        row_mock = Mock()
+        soup_mock.return_value = Mock()
+        soup_mock.return_value.table.find.return_value = None  # No tbody
         soup_mock.return_value.table.return_value = [row_mock]
         row_mock.return_value = None
 
@@ -214,9 +220,13 @@ class UnitTableToDictCleanTests(unittest.TestCase):
 
         # Then
         self.assertEqual(result, expected_result)
-        soup_mock.assert_called_once_with(data, "html.parser")
-        soup_mock.return_value.table.assert_called_once_with("tr")
-        row_mock.assert_called_once_with("td")
+        soup_mock.assert_called_once_with(
+            data, wiki.HTML_PARSER, parse_only=wiki.TABLE_STRAINER)
+        soup_mock.return_value.table.find.assert_called_once_with(
+            "tbody", recursive=False)
+        soup_mock.return_value.table.assert_called_once_with(
+            "tr", recursive=False)
+        row_mock.assert_called_once_with("td", recursive=False)
 
     @patch("punter.scrape.wiki.clean")
     @patch("punter.scrape.wiki.BeautifulSoup")
@@ -224,46 +234,11 @@ class UnitTableToDictCleanTests(unittest.TestCase):
         """ Tests result when input data has valid format. """
         # Given
         data = "<html><table>...valid rows/columns...</table></html>"
-        expected_dict = {
-            "name": {
-                "name": "name",
-                "costs": {
-                    "gold": 3,
-                    "energy": 4,
-                    "green": 5,
-                    "blue": 6,
-                    "red": 7,
-                    },
-                "stats": {
-                    "attack": 15,
-                    "health": 10,
-                    },
-                "attributes": {
-                    "supply": 8,
-                    "frontline": True,
-                    "fragile": False,
-                    "blocker": True,
-                    "prompt": False,
-                    "stamina": 16,
-                    "lifespan": 19,
-                    "build_time": 9,
-                    "exhaust_turn": 17,
-                    "exhaust_ability": 18,
-                    },
-                "links": {
-                    "path": "/name",
-                    },
-                "type": 1,
-                "unit_spell": "unit/spell",
-                }
-            }
+        expected_dict = UNIT_DATA
         expected_result = expected_dict
 
-        row_mock = MagicMock()
-        soup_mock.return_value = MagicMock()
-        soup_mock.return_value.table.return_value = [row_mock]
-        row_mock.return_value = [
-            MagicMock(a={"href": "/name"}),
+        row = [
+            Mock(a={"href": "/name"}),
             "1",
             "unit/spell",
             "3",
@@ -284,197 +259,81 @@ class UnitTableToDictCleanTests(unittest.TestCase):
             "18",
             "19",
             ]
-        clean_mock.side_effect = [
+        cleaned = dict(zip(map(id, row), [
             "name",
+            1,
+            "unit/spell",
             3,
             4,
             5,
             6,
             7,
-            "15",
-            10,
             8,
+            9,
+            10,
             True,
             False,
             True,
             False,
+            "15",
             16,
-            19,
-            9,
             17,
             18,
-            1,
-            "unit/spell",
-            "name",
-            ]
+            19,
+            ]))
+        row_mock = Mock()
+        soup_mock.return_value = Mock()
+        soup_mock.return_value.table.find.return_value = None  # No tbody
+        soup_mock.return_value.table.return_value = [row_mock]
+        row_mock.return_value = row
+        # Keyed by cell, so the result does not depend on call order
+        clean_mock.side_effect = lambda element, cast=str: cleaned[id(element)]
 
         # When
         result = unit_table_to_dict(data)
 
         # Then
         self.assertEqual(result, expected_result)
-        soup_mock.assert_called_once_with(data, "html.parser")
-        soup_mock.return_value.table.assert_called_once_with("tr")
-        row_mock.assert_called_once_with("td")
-        clean_mock.assert_has_calls([])
-
-
-class ExportUnitsJsonCleanTests(unittest.TestCase):
-    """ Tests success cases for scrape.wiki.export_units_json. """
-
-    def setUp(self):
-        self.file_name = "units.json.test"
-
-    @patch("builtins.open")
-    def test_success(self, open_mock):
-        """ Tests json file is saved when valid format is provided. """
-        # Given
-        data = {
-            "name": {
-                "name": "name",
-                "costs": {
-                    "gold": 3,
-                    "energy": 4,
-                    "green": 5,
-                    "blue": 6,
-                    "red": 7,
-                    },
-                "stats": {
-                    "attack": 15,
-                    "health": 10,
-                    },
-                "attributes": {
-                    "supply": 8,
-                    "frontline": True,
-                    "fragile": False,
-                    "blocker": True,
-                    "prompt": False,
-                    "stamina": 16,
-                    "lifespan": 19,
-                    "build_time": 9,
-                    "exhaust_turn": 17,
-                    "exhaust_ability": 18,
-                    },
-                "links": {
-                    "path": "/name",
-                    },
-                "type": 1,
-                "unit_spell": "unit/spell",
-                }
-            }
-        json_data = json.dumps(
-            data, sort_keys=True, indent=4, separators=(",", ": "))
-        expected_result = {"message": "Success"}
-
-        open_mock.return_value = open_mock
-
-        # When
-        result = export_units_json(data, file_name=self.file_name)
-
-        # Then
-        self.assertEqual(result, expected_result)
-        open_mock.assert_has_calls([
-            call(self.file_name, "w"),
-            call.__enter__(),
-            call.__enter__().write(json_data),
-            call.__exit__(None, None, None),
-            ])
-
-
-class ExportUnitsCsvDirtyTests(unittest.TestCase):
-    """ Tests error cases for scrape.wiki.export_units_csv. """
-
-    def setUp(self):
-        self.file_name = "units.csv.test"
-
-    def tearDown(self):
-        if os.path.isfile(self.file_name):
-            os.remove(self.file_name)
-
-    def test_format_attribute(self):
-        """ Tests error when invalid data format is provided. """
+        soup_mock.assert_called_once_with(
+            data, wiki.HTML_PARSER, parse_only=wiki.TABLE_STRAINER)
+        soup_mock.return_value.table.find.assert_called_once_with(
+            "tbody", recursive=False)
+        soup_mock.return_value.table.assert_called_once_with(
+            "tr", recursive=False)
+        row_mock.assert_called_once_with("td", recursive=False)
+        # Every cell (unit name included) is cleaned once
+        self.assertEqual(clean_mock.call_count, len(row))
+
+    def test_uppercase_tags(self):
+        """ Tests tags are matched regardless of their case. """
         # Given
-        data = {"bad": "wrong"}
-        expected_result = {"message": "Invalid format (nested data)."}
+        cells = "".join(f"<TD>{number}</TD>" for number in range(1, 20))
+        data = (
+            "<TABLE><TR><TD><A HREF='/Drone'>Drone</A></TD>"
+            f"{cells}</TR></TABLE>")
 
         # When
-        result = export_units_csv(data, file_name=self.file_name)
-
-        # Then
-        self.assertEqual(result, expected_result)
-        self.assertFalse(os.path.isfile(self.file_name))
-
-    def test_invalid_key(self):
-        """ Tests error when invalid data format is provided. """
-        # Given
-        data = {"bad": {}}
-        expected_result = {"message": "Invalid format (missing key)."}
-
-        # When
-        result = export_units_csv(data, file_name=self.file_name)
+        result = unit_table_to_dict(data)
 
         # Then
-        self.assertEqual(result, expected_result)
-        self.assertFalse(os.path.isfile(self.file_name))
-
+        self.assertEqual(list(result), ["Drone"])
 
-class ExportUnitsCsvCleanTests(unittest.TestCase):
-    """ Tests success cases for scrape.wiki.export_units_csv. """
-
-    def setUp(self):
-        self.file_name = "units.csv.test"
-
-    def tearDown(self):
-        if os.path.isfile(self.file_name):
-            os.remove(self.file_name)
-
-    def test_success(self):
-        """ Tests csv file is saved when valid format is provided. """
+    def test_nested_table(self):
+        """ Tests rows of tables nested in a cell are not parsed as units. """
         # Given
-        data = {
-            "name": {
-                "name": "name",
-                "costs": {
-                    "gold": 3,
-                    "energy": 4,
-                    "green": 5,
-                    "blue": 6,
-                    "red": 7,
-                    },
-                "stats": {
-                    "attack": 15,
-                    "health": 10,
-                    },
-                "attributes": {
-                    "supply": 8,
-                    "frontline": True,
-                    "fragile": False,
-                    "blocker": True,
-                    "prompt": False,
-                    "stamina": 16,
-                    "lifespan": 19,
-                    "build_time": 9,
-                    "exhaust_turn": 17,
-                    "exhaust_ability": 18,
-                    },
-                "links": {
-                    "path": "/name",
-                    },
-                "type": 1,
-                "unit_spell": "unit/spell",
-                "change_history": {
-                    "May 1st, 1984": ["Change1", "Change2"],
-                    },
-                }
-            }
-        expected_result = {"message": "Success"}
+        cells = "".join(f"<td>{number}</td>" for number in range(3, 20))
+        data = (
+            "<table><tbody><tr><th>Name</th></tr>"
+            "<tr><td><a href='/Drone'>Drone</a></td><td>1</td>"
+            "<td><table><tr><td>Nested</td></tr></table></td>"
+            f"{cells}</tr></tbody></table>")
 
         # When
-        result = export_units_csv(data, file_name=self.file_name)
+        result = unit_table_to_dict(data)
 
         # Then
-        self.assertEqual(result, expected_result)
-        self.assertTrue(os.path.isfile(self.file_name))
+        self.assertEqual(list(result), ["Drone"])
+        self.assertEqual(result["Drone"]["links"], {"path": "/Drone"})
 
 
 class CleanSymbolsCleanTests(unittest.TestCase):
@@ -483,7 +342,7 @@ class CleanSymbolsCleanTests(unittest.TestCase):
     def test_no_links(self):
         """ Tests result when input data has no links (a tag). """
         # Given
-        tag_obj = MagicMock()
+        tag_obj = Mock()
         expected_result = tag_obj
 
         tag_obj.return_value = []
@@ -498,8 +357,8 @@ class CleanSymbolsCleanTests(unittest.TestCase):
     def test_links(self):
         """ Tests result when input data has links (a tag). """
         # Given
-        tag_obj = MagicMock()
-        icon_obj = MagicMock()
+        tag_obj = Mock()
+        icon_obj = Mock()
         expected_result = tag_obj
 
         tag_obj.return_value = [icon_obj]
@@ -514,6 +373,50 @@ class CleanSymbolsCleanTests(unittest.TestCase):
         icon_obj.get.assert_called_once_with("title")
         icon_obj.replace_with.assert_called_once_with("X")
 
+    def test_other_links(self):
+        """ Tests links that are not symbols are kept. """
+        # Given
+        tag_obj = Mock()
+        icon_obj = Mock()
+        expected_result = tag_obj
+
+        tag_obj.return_value = [icon_obj]
+        icon_obj.get.return_value = "Engineer"
+
+        # When
+        result = clean_symbols(tag_obj)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        tag_obj.assert_called_once_with("a")
+        icon_obj.get.assert_called_once_with("title")
+        self.assertFalse(icon_obj.replace_with.called)
+
+
+class SymbolTextCleanTests(unittest.TestCase):
+    """ Tests success cases for scrape.wiki.symbol_text. """
+
+    def test_text(self):
+        """ Tests symbol links are replaced and other text is kept. """
+        # Given
+        html = (
+            '<div><a title="Ability"><img/></a>: Gain 1 '
+            '<a title="Gold"><img/></a>.<!-- note --> Also gain '
+            '<a title="Attack"><img/></a> and see '
+            '<a title="Engineer">Engineers</a>.</div>')
+        element = BeautifulSoup(html, "lxml").div
+        expected_result = clean_symbols(
+            BeautifulSoup(html, "lxml").div).get_text()
+
+        # When
+        result = symbol_text(element)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertEqual(
+            result, "Click: Gain 1 . Also gain X and see Engineers.")
+        self.assertEqual(len(element("a")), 4)  # Element is not changed
+
 
 class CleanChangesCleanTests(unittest.TestCase):
     """ Tests success cases for scrape.wiki.clean_changes. """
@@ -521,7 +424,7 @@ class CleanChangesCleanTests(unittest.TestCase):
     def test_no_changes(self):
         """ Tests result when input data has no changes. """
         # Given
-        tag_obj = MagicMock()
+        tag_obj = Mock()
         expected_result = []
 
         tag_obj.ul.return_value = []
@@ -533,17 +436,16 @@ class CleanChangesCleanTests(unittest.TestCase):
         self.assertEqual(result, expected_result)
         tag_obj.ul.assert_called_once_with("li")
 
-    @patch("punter.scrape.wiki.clean_symbols")
-    def test_changes(self, symbols_mock):
+    @patch("punter.scrape.wiki.symbol_text")
+    def test_changes(self, text_mock):
         """ Tests result when input data has changes. """
         # Given
-        tag_obj = MagicMock()
-        element_obj = MagicMock()
+        tag_obj = Mock()
+        element_obj = Mock()
         expected_result = ["some change"]
 
         tag_obj.ul.return_value = [element_obj]
-        symbols_mock.return_value = element_obj
-        element_obj.get_text.return_value = " \n some\n change \n "
+        text_mock.return_value = " \n some\n change \n "
 
         # When
         result = clean_changes(tag_obj)
@@ -551,8 +453,52 @@ class CleanChangesCleanTests(unittest.TestCase):
         # Then
         self.assertEqual(result, expected_result)
         tag_obj.ul.assert_called_once_with("li")
-        symbols_mock.assert_called_once_with(element_obj)
-        element_obj.get_text.assert_called_once_with()
+        text_mock.assert_called_once_with(element_obj)
+
+
+class ParseDayCleanTests(unittest.TestCase):
+    """ Tests success cases for scrape.wiki._parse_day. """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        wiki._parse_day.cache_clear()
+        self.addCleanup(wiki._parse_day.cache_clear)
+
+    def test_ordinals(self):
+        """ Tests days with each ordinal suffix. """
+        for day, expected_result in (
+                ("October 1st, 1984", "1984-10-01"),
+                ("October 2nd, 1984", "1984-10-02"),
+                ("October 3rd, 1984", "1984-10-03"),
+                ("October 4th, 1984", "1984-10-04"),
+                ):
+            with self.subTest(day=day):
+                # When
+                result = wiki._parse_day(day)
+
+                # Then
+                self.assertEqual(result, expected_result)
+
+    def test_invalid(self):
+        """ Tests days in an unknown format. """
+        for day in ("Smarch 1st, 1984", "October 32nd, 1984", "October"):
+            with self.subTest(day=day):
+                # Then
+                with self.assertRaises(ValueError):
+                    wiki._parse_day(day)
+
+    def test_cached(self):
+        """ Tests repeated days are only parsed once. """
+        # Given
+        day = "October 31st, 1984"
+        expected_result = "1984-10-31"
+
+        # When
+        result = [wiki._parse_day(day), wiki._parse_day(day)]
+
+        # Then
+        self.assertEqual(result, [expected_result, expected_result])
+        self.assertEqual(wiki._parse_day.cache_info().hits, 1)
 
 
 class CleanChangeLogCleanTests(unittest.TestCase):
@@ -597,14 +543,15 @@ class CleanChangeLogCleanTests(unittest.TestCase):
             expected_day2: expected_change2,
             }
 
-        changes1 = MagicMock(
-            stripped_strings=("October 31st, 1984",))
-        changes2 = MagicMock(
-            stripped_strings=("December 2nd, 1999",))
+        changes1 = Mock(
+            stripped_strings=iter(("October 31st, 1984", "change1")))
+        changes2 = Mock(
+            stripped_strings=iter(("December 2nd, 1999", "change3")))
+        empty = Mock(stripped_strings=iter(()))
         change_log.return_value = change_log
         change_log.find_parent.return_value = change_log
         change_log.find_next.return_value = change_log
-        change_log.find_all.return_value = [changes1, changes2]
+        change_log.find_all.return_value = [changes1, empty, changes2]
         clean_mock.side_effect = [expected_change1, expected_change2]
 
         # When
@@ -636,28 +583,43 @@ class UnitToDictDirtyTests(unittest.TestCase):
         data = ""
         expected_result = {}
 
-        soup_mock.return_value = None
-
         # When
         result = unit_to_dict(data)
 
         # Then
         self.assertEqual(result, expected_result)
-        soup_mock.assert_called_once_with(data, "html.parser")
+        soup_mock.assert_not_called()
+
+    def test_no_box(self):
+        """ Tests result when "box" is only part of other words. """
+        pages = (
+            "<html><body><input id='searchboxInput'/></body></html>",
+            "<html><body><div class='title'>box</div></body></html>",
+            )
+        for data in pages:
+            with self.subTest(data=data):
+                # Given
+                expected_result = {}
+
+                # When
+                result = unit_to_dict(data)
+
+                # Then
+                self.assertEqual(result, expected_result)
 
 
 class UnitToDictCleanTests(unittest.TestCase):
     """ Tests success cases for scrape.wiki.unit_to_dict. """
 
     @patch("punter.scrape.wiki.clean_change_log")
-    @patch("punter.scrape.wiki.clean_symbols")
+    @patch("punter.scrape.wiki.symbol_text")
     @patch("punter.scrape.wiki.clean")
     @patch("punter.scrape.wiki.BeautifulSoup")
     def test_valid_input_format(
-            self, soup_mock, clean_mock, symbols_mock, changes_mock):
+            self, soup_mock, clean_mock, text_mock, changes_mock):
         """ Tests result when input data has valid format. """
         # Given
-        data = "<html><table>...valid structure...</table></html>"
+        data = "<html><div class='box'>...valid structure...</div></html>"
         name = "Unit Name"
         path = "/Unit_Name"
         image_url = "https://image.url.com"
@@ -678,21 +640,20 @@ class UnitToDictCleanTests(unittest.TestCase):
             "position": "Middle Far Right",
             }
 
-        div_box = MagicMock()
-        change_log = MagicMock()
+        div_box = Mock()
+        change_log = Mock()
         soup_mock.return_value = soup_mock
-        soup_mock.select_one.side_effect = [
+        soup_mock.find.side_effect = [
             div_box,
             change_log,
             name,
-            MagicMock(a={"href": path}),
+            Mock(a={"href": path}),
             {"src": image_url},
-            {"src": panel_url},
             ]
+        soup_mock.select_one.return_value = {"src": panel_url}
         clean_mock.return_value = name
         div_box.return_value = abilities
-        symbols_mock.return_value = symbols_mock
-        symbols_mock.get_text.return_value = abilities[-1]
+        text_mock.return_value = abilities[-1]
         changes_mock.return_value = {
             "day 1": ["change1", "change2"],
             "day 2": ["change3"],
@@ -703,254 +664,17 @@ class UnitToDictCleanTests(unittest.TestCase):
 
         # Then
         self.assertEqual(result, expected_result)
-        soup_mock.assert_called_once_with(data, "html.parser")
-        soup_mock.select_one.assert_has_calls([
-            call("div.box"),
-            call("#Change_log"),
-            call("div.title"),
-            call("#ca-view"),
-            call(".thumbimage"),
-            call("p > a.image > img"),
+        soup_mock.assert_called_once_with(
+            data, wiki.HTML_PARSER, parse_only=wiki.BODY_STRAINER)
+        soup_mock.find.assert_has_calls([
+            call("div", class_="box"),
+            call(id="Change_log"),
+            call("div", class_="title"),
+            call(id="ca-view"),
+            call(class_="thumbimage"),
             ])
+        soup_mock.select_one.assert_called_once_with("p > a.image > img")
         div_box.assert_called_once_with("div")
         clean_mock.assert_called_once_with(name)
-        symbols_mock.assert_has_calls([
-            call(abilities[-1]),
-            call.get_text(),
-            ])
+        text_mock.assert_called_once_with(abilities[-1])
         changes_mock.assert_called_once_with(change_log)
-
-
-class FetchUnitsDirtyTests(unittest.TestCase):
-    """ Tests error cases for scrape.wiki.fetch_units. """
-
-    def setUp(self):
-        self.base_url = config.PRISMATA_WIKI["BASE_URL"]
-
-    @patch("punter.scrape.wiki.get_content")
-    def test_invalid_url_config(self, content_mock):
-        """ Tests invalid URL configuration. """
-        # Given
-        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
-        expected_result = {}
-
-        content_mock.return_value = ""
-
-        # When
-        result = fetch_units()
-
-        # Then
-        self.assertEqual(result, expected_result)
-        content_mock.assert_called_once_with(expected_url, save_file=False)
-
-    @patch("punter.scrape.wiki.unit_table_to_dict")
-    @patch("punter.scrape.wiki.get_content")
-    def test_no_units(self, content_mock, table_mock):
-        """ Tests fetch for all units returns nothing. """
-        # Given
-        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
-        expected_data = "invalid content"
-        expected_result = {}
-
-        content_mock.return_value = expected_data
-        table_mock.return_value = expected_result
-
-        # When
-        result = fetch_units()
-
-        # Then
-        self.assertEqual(result, expected_result)
-        content_mock.assert_called_once_with(expected_url, save_file=False)
-        table_mock.assert_called_once_with(expected_data)
-
-
-class FetchUnitsCleanTests(unittest.TestCase):
-    """ Tests success cases for scrape.wiki.fetch_units. """
-
-    def setUp(self):
-        self.base_url = config.PRISMATA_WIKI["BASE_URL"]
-
-    @patch("punter.scrape.wiki.unit_to_dict")
-    @patch("punter.scrape.wiki.delay")
-    @patch("punter.scrape.wiki.unit_table_to_dict")
-    @patch("punter.scrape.wiki.get_content")
-    def test_no_details(self, content_mock, table_mock, delay_mock, unit_mock):
-        """ Tests fetch no details for units. """
-        # Given
-        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
-        expected_raw_data = "some data"
-        expected_data = {
-            "unit1": {"key1": "val1", "links": {"path": "/unit1"}},
-            "unit2": {"key3": "val3", "links": {"path": "/unit2"}},
-            }
-        expected_result = expected_data
-
-        content_mock.side_effect = [
-            expected_raw_data,
-            "",
-            "",
-            ]
-        table_mock.return_value = expected_data
-        unit_mock.side_effect = [{}, {}]
-
-        # When
-        result = fetch_units()
-
-        # Then
-        self.assertEqual(result, expected_result)
-        content_mock.assert_has_calls([
-            call(expected_url, save_file=False),
-            call(
-                f"{self.base_url}{expected_data['unit1']['links']['path']}",
-                save_file=False),
-            call(
-                f"{self.base_url}{expected_data['unit2']['links']['path']}",
-                save_file=False),
-            ])
-        table_mock.assert_called_once_with(expected_raw_data)
-        delay_mock.assert_has_calls([
-            call(),
-            call(),
-            ])
-        unit_mock.assert_has_calls([
-            call(""),
-            call(""),
-            ])
-
-    @patch("punter.scrape.wiki.unit_to_dict")
-    @patch("punter.scrape.wiki.delay")
-    @patch("punter.scrape.wiki.unit_table_to_dict")
-    @patch("punter.scrape.wiki.get_content")
-    def test_details_all(
-            self, content_mock, table_mock, delay_mock, unit_mock):
-        """ Tests fetch details for all units. """
-        # Given
-        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
-        expected_raw_table = "raw table"
-        expected_raw_unit1 = "raw unit 1"
-        expected_raw_unit2 = "raw unit 2"
-        expected_table_data = {
-            "unit1": {
-                "key1": "val1",
-                "links": {"path": "/unit1"},
-                },
-            "unit2": {
-                "key3": "val3",
-                "links": {"path": "/unit2"},
-                },
-            }
-        expected_unit1 = {
-            "name": "unit1",
-            "keyX": "extra val 1",
-            "links": {"valW": "sub3"},
-            }
-        expected_unit2 = {
-            "name": "unit2",
-            "keyZ": "extra val 2",
-            "links": {"valY": "sub4"},
-            }
-        expected_data = {
-            "unit1": {
-                "key1": "val1",
-                "links": {"path": "/unit1", "valW": "sub3"},
-                "name": "unit1",
-                "keyX": "extra val 1",
-                },
-            "unit2": {
-                "key3": "val3",
-                "links": {"path": "/unit2", "valY": "sub4"},
-                "name": "unit2",
-                "keyZ": "extra val 2",
-                },
-            }
-        expected_result = expected_data
-
-        content_mock.side_effect = [
-            expected_raw_table,
-            expected_raw_unit1,
-            expected_raw_unit2,
-            ]
-        table_mock.return_value = expected_table_data
-        unit_mock.side_effect = [expected_unit1, expected_unit2]
-
-        # When
-        result = fetch_units()
-
-        # Then
-        self.assertEqual(result, expected_result)
-        content_mock.assert_has_calls([
-            call(expected_url, save_file=False),
-            call(
-                f"{self.base_url}{expected_data['unit1']['links']['path']}",
-                save_file=False),
-            call(
-                f"{self.base_url}{expected_data['unit2']['links']['path']}",
-                save_file=False),
-            ])
-        table_mock.assert_called_once_with(expected_raw_table)
-        delay_mock.assert_has_calls([
-            call(),
-            call(),
-            ])
-        unit_mock.assert_has_calls([
-            call(expected_raw_unit1),
-            call(expected_raw_unit2),
-            ])
-
-    @patch("punter.scrape.wiki.unit_to_dict")
-    @patch("punter.scrape.wiki.delay")
-    @patch("punter.scrape.wiki.unit_table_to_dict")
-    @patch("punter.scrape.wiki.get_content")
-    def test_details_some(
-            self, content_mock, table_mock, delay_mock, unit_mock):
-        """ Tests fetch details for specific units. """
-        # Given
-        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
-        expected_raw_table = "raw table"
-        expected_raw_unit1 = "raw unit 2"
-        expected_table_data = {
-            "unit1": {
-                "key1": "val1",
-                "links": {"path": "/unit1"},
-                },
-            "unit2": {
-                "key3": "val3",
-                "links": {"path": "/unit2"},
-                },
-            }
-        expected_unit1 = {
-            "name": "unit2",
-            "keyZ": "extra val 2",
-            "links": {"valY": "sub4"},
-            }
-        expected_data = {
-            "unit2": {
-                "key3": "val3",
-                "links": {"path": "/unit2", "valY": "sub4"},
-                "name": "unit2",
-                "keyZ": "extra val 2",
-                },
-            }
-        expected_result = expected_data
-
-        content_mock.side_effect = [
-            expected_raw_table,
-            expected_raw_unit1,
-            ]
-        table_mock.return_value = expected_table_data
-        unit_mock.side_effect = [expected_unit1]
-
-        # When
-        result = fetch_units(include=["unit2"])
-
-        # Then
-        self.assertEqual(result, expected_result)
-        content_mock.assert_has_calls([
-            call(expected_url, save_file=False),
-            call(
-                f"{self.base_url}{expected_data['unit2']['links']['path']}",
-                save_file=False),
-            ])
-        table_mock.assert_called_once_with(expected_raw_table)
-        delay_mock.assert_called_once_with()
-        unit_mock.assert_called_once_with(expected_raw_unit1)
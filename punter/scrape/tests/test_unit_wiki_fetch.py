@@ -0,0 +1,989 @@
+""" Test for scrape.wiki module (fetching and caching). """
+import logging
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from unittest.mock import (
+    call,
+    Mock,
+    mock_open,
+    patch,
+    )
+
+import requests
+
+from punter.scrape import (
+    config,
+    wiki,
+    )
+from punter.scrape.wiki import (
+    close_session,
+    fetch_units,
+    get_content,
+    )
+
+
+logging.disable()
+
+
+class GetContentDirtyTests(unittest.TestCase):
+    """ Tests for error cases for scrape.wiki.get_content. """
+
+    def setUp(self):
+        patches = ExitStack()
+        self.addCleanup(patches.close)
+        self.requests_mock = patches.enter_context(
+            patch("punter.scrape.wiki._SESSION.get"))
+        self.throttle_mock = patches.enter_context(
+            patch("punter.scrape.wiki.throttle"))
+
+    def test_error(self):
+        """ Tests response when request is not successfull. """
+        # Given
+        url = "http://example.com"
+        expected_result = ""
+
+        self.requests_mock.return_value = Mock(status_code=400)
+
+        # When
+        result = get_content(url)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.requests_mock.assert_called_once_with(
+            url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+
+
+class GetContentCleanTests(unittest.TestCase):
+    """ Tests for success cases for scrape.wiki.get_content. """
+
+    def setUp(self):
+        patches = ExitStack()
+        self.addCleanup(patches.close)
+        self.requests_mock = patches.enter_context(
+            patch("punter.scrape.wiki._SESSION.get"))
+        self.throttle_mock = patches.enter_context(
+            patch("punter.scrape.wiki.throttle"))
+
+    def test_success(self):
+        """ Tests response when request is successfull. """
+        # Given
+        url = "http://example.com"
+        expected_result = "<html></html>"
+
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            )
+
+        # When
+        result = get_content(url)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.throttle_mock.assert_called_once_with("example.com")
+        self.requests_mock.assert_called_once_with(
+            url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+
+    @patch("punter.scrape.wiki.BeautifulSoup")
+    @patch("os.makedirs")
+    @patch("builtins.open", new_callable=mock_open)
+    def test_save(self, open_mock, makedirs_mock, soup_mock):
+        """ Tests saving of content when request is successfull. """
+        # Given
+        url = "http://example.com/Unit"
+        save_name = os.path.join(config.PRISMATA_WIKI["SAVE_PATH"], "Unit")
+        expected_result = "<html></html>"
+
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            )
+
+        # When
+        result = get_content(url, save_file=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.requests_mock.assert_called_once_with(
+            url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+        makedirs_mock.assert_called_once_with(
+            config.PRISMATA_WIKI["SAVE_PATH"], exist_ok=True)
+        open_mock.assert_called_once_with(save_name, "wb")
+        open_mock().write.assert_called_once_with(
+            expected_result.encode("utf-8"))
+        self.assertFalse(soup_mock.called)
+
+    @patch("punter.scrape.wiki.BeautifulSoup")
+    @patch("os.makedirs")
+    @patch("builtins.open", new_callable=mock_open)
+    def test_save_pretty(self, open_mock, makedirs_mock, soup_mock):
+        """ Tests saving of prettified content. """
+        # Given
+        url = "http://example.com/Unit"
+        save_name = os.path.join(config.PRISMATA_WIKI["SAVE_PATH"], "Unit")
+        expected_result = "<html></html>"
+
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            )
+        soup_mock.return_value = soup_mock
+        soup_mock.prettify.return_value = expected_result
+
+        # When
+        result = get_content(url, save_file=True, pretty=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.requests_mock.assert_called_once_with(
+            url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+        makedirs_mock.assert_called_once_with(
+            config.PRISMATA_WIKI["SAVE_PATH"], exist_ok=True)
+        open_mock.assert_called_once_with(save_name, "w", encoding="utf-8")
+        open_mock().write.assert_called_once_with(expected_result)
+        soup_mock.assert_has_calls([
+            call(expected_result, wiki.HTML_PARSER),
+            call.prettify(),
+            ])
+
+    @patch("punter.scrape.wiki.read_text")
+    @patch("os.path.isfile")
+    def test_read_from_file(self, isfile_mock, read_mock):
+        """ Tests content when file exists (instead of calling url). """
+        # Given
+        path = "/path/to/file.html"
+        expected_result = "<html></html>"
+
+        isfile_mock.return_value = True
+        read_mock.return_value = expected_result
+
+        # When
+        result = get_content(path)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertFalse(self.throttle_mock.called)
+        self.assertFalse(self.requests_mock.called)
+        read_mock.assert_called_once_with(path)
+
+
+class GetContentCacheTests(unittest.TestCase):
+    """ Tests for on-disk cache use in scrape.wiki.get_content. """
+    # pylint: disable=too-many-instance-attributes
+
+    def setUp(self):
+        self.url = "http://example.com"
+        self.cache_file = "/cache/file"
+        patches = ExitStack()
+        self.addCleanup(patches.close)
+        self.requests_mock = patches.enter_context(
+            patch("punter.scrape.wiki._SESSION.get"))
+        self.throttle_mock = patches.enter_context(
+            patch("punter.scrape.wiki.throttle"))
+        self.path_mock = patches.enter_context(
+            patch("punter.scrape.wiki.cache_path"))
+        self.read_mock = patches.enter_context(
+            patch("punter.scrape.wiki.read_cached"))
+        self.write_mock = patches.enter_context(
+            patch("punter.scrape.wiki.write_cached"))
+        self.read_headers_mock = patches.enter_context(
+            patch("punter.scrape.wiki.read_json"))
+        self.write_headers_mock = patches.enter_context(
+            patch("punter.scrape.wiki.write_json"))
+        self.utime_mock = patches.enter_context(
+            patch("punter.scrape.wiki.os.utime"))
+        self.path_mock.return_value = self.cache_file
+        self.read_headers_mock.return_value = None
+
+    def test_fresh(self):
+        """ Tests fresh cached content is used without a request. """
+        # Given
+        expected_result = "<html>cached</html>"
+
+        self.read_mock.return_value = expected_result
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.path_mock.assert_called_once_with(
+            self.url, config.PRISMATA_WIKI["CACHE_PATH"])
+        self.read_mock.assert_called_once_with(
+            self.cache_file, max_age=config.GENERAL["CACHE_TTL"])
+        self.assertFalse(self.throttle_mock.called)
+        self.assertFalse(self.requests_mock.called)
+        self.assertFalse(self.write_mock.called)
+
+    @patch("os.makedirs")
+    @patch("builtins.open", new_callable=mock_open)
+    def test_fresh_save(self, open_mock, makedirs_mock):
+        """ Tests fresh cached content is still saved with save_file. """
+        # Given
+        url = f"{self.url}/Unit"
+        save_name = os.path.join(config.PRISMATA_WIKI["SAVE_PATH"], "Unit")
+        expected_result = "<html>cached</html>"
+
+        self.read_mock.return_value = expected_result
+
+        # When
+        result = get_content(url, save_file=True, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertFalse(self.requests_mock.called)
+        makedirs_mock.assert_called_once_with(
+            config.PRISMATA_WIKI["SAVE_PATH"], exist_ok=True)
+        open_mock.assert_called_once_with(save_name, "wb")
+        open_mock().write.assert_called_once_with(
+            expected_result.encode("utf-8"))
+
+    @patch("os.makedirs")
+    @patch("builtins.open", new_callable=mock_open)
+    def test_stale_save(self, open_mock, makedirs_mock):
+        """ Tests stale cached content is saved when the request fails. """
+        # Given
+        url = f"{self.url}/Unit"
+        save_name = os.path.join(config.PRISMATA_WIKI["SAVE_PATH"], "Unit")
+        expected_result = "<html>stale</html>"
+
+        self.read_mock.side_effect = [None, expected_result]
+        self.requests_mock.side_effect = requests.ConnectionError
+
+        # When
+        result = get_content(url, save_file=True, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        makedirs_mock.assert_called_once_with(
+            config.PRISMATA_WIKI["SAVE_PATH"], exist_ok=True)
+        open_mock.assert_called_once_with(save_name, "wb")
+        open_mock().write.assert_called_once_with(
+            expected_result.encode("utf-8"))
+
+    def test_refresh(self):
+        """ Tests expired cache is refreshed from the request. """
+        # Given
+        expected_result = "<html></html>"
+
+        self.read_mock.return_value = None
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            headers={"ETag": '"abc"', "Content-Type": "text/html"},
+            )
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertFalse(self.read_headers_mock.called)  # Nothing cached
+        self.requests_mock.assert_called_once_with(
+            self.url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+        self.write_mock.assert_called_once_with(
+            self.cache_file, expected_result)
+        self.write_headers_mock.assert_called_once_with(
+            f"{self.cache_file}.headers", {"If-None-Match": '"abc"'})
+
+    def test_write_error(self):
+        """ Tests content is returned when the cache can't be written. """
+        # Given
+        expected_result = "<html></html>"
+
+        self.read_mock.return_value = None
+        self.write_mock.side_effect = PermissionError("read-only")
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            headers={},
+            )
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.write_mock.assert_called_once_with(
+            self.cache_file, expected_result)
+
+    def test_missing_body(self):
+        """ Tests validators aren't sent when the cached body is missing. """
+        # Given
+        expected_result = "<html></html>"
+
+        self.read_mock.return_value = None
+        self.read_headers_mock.return_value = {"If-None-Match": '"abc"'}
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            headers={},
+            )
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.requests_mock.assert_called_once_with(
+            self.url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+        self.write_mock.assert_called_once_with(
+            self.cache_file, expected_result)
+
+    def test_not_modified(self):
+        """ Tests expired cache is revalidated and kept on 304. """
+        # Given
+        expected_result = "<html>cached</html>"
+        conditional = {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 31 Oct 1984 00:00:00 GMT",
+            }
+
+        self.read_mock.side_effect = [None, expected_result]
+        self.read_headers_mock.return_value = conditional
+        self.requests_mock.return_value = Mock(status_code=304, text="")
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.requests_mock.assert_called_once_with(
+            self.url, timeout=config.GENERAL["REQUEST_TIMEOUT"],
+            headers=conditional)
+        self.utime_mock.assert_called_once_with(self.cache_file)
+        self.assertFalse(self.write_mock.called)
+        self.assertFalse(self.write_headers_mock.called)
+
+    def test_headers_read_error(self):
+        """ Tests a plain request is sent when validators can't be read. """
+        # Given
+        expected_result = "<html></html>"
+
+        self.read_mock.side_effect = [None, "<html>cached</html>"]
+        self.read_headers_mock.side_effect = PermissionError("denied")
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            headers={},
+            )
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.requests_mock.assert_called_once_with(
+            self.url, timeout=config.GENERAL["REQUEST_TIMEOUT"], headers={})
+
+    def test_headers_write_error(self):
+        """ Tests content is returned when validators can't be written. """
+        # Given
+        expected_result = "<html></html>"
+
+        self.read_mock.return_value = None
+        self.write_headers_mock.side_effect = OSError("disk full")
+        self.requests_mock.return_value = Mock(
+            status_code=200,
+            text=expected_result,
+            content=expected_result.encode("utf-8"),
+            headers={"ETag": '"abc"'},
+            )
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.write_headers_mock.assert_called_once_with(
+            f"{self.cache_file}.headers", {"If-None-Match": '"abc"'})
+
+    def test_stale_on_error(self):
+        """ Tests stale cache is used when the request fails. """
+        # Given
+        expected_result = "<html>stale</html>"
+
+        self.read_mock.side_effect = [None, expected_result]
+        self.requests_mock.side_effect = requests.ConnectionError
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.read_mock.assert_has_calls([
+            call(self.cache_file, max_age=config.GENERAL["CACHE_TTL"]),
+            call(self.cache_file),
+            ])
+        self.assertFalse(self.write_mock.called)
+
+    def test_no_stale_on_error(self):
+        """ Tests empty content when request fails and nothing is cached. """
+        # Given
+        expected_result = ""
+
+        self.read_mock.return_value = None
+        self.requests_mock.return_value = Mock(status_code=500)
+
+        # When
+        result = get_content(self.url, use_cache=True)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.assertFalse(self.write_mock.called)
+
+
+class SaveContentDirtyTests(unittest.TestCase):
+    """ Tests for error cases for scrape.wiki._save_content. """
+    # pylint: disable=protected-access
+
+    @patch("os.makedirs")
+    @patch("builtins.open", new_callable=mock_open)
+    def test_outside_save_path(self, open_mock, makedirs_mock):
+        """ Tests paths escaping SAVE_PATH aren't saved. """
+        cases = (
+            "http://example.com/../../etc/passwd",
+            "http://example.com/Unit/../../../outside",
+            "http://example.com/.",
+            )
+        for url in cases:
+            with self.subTest(url=url):
+                # When
+                wiki._save_content(url, "<html></html>")
+
+                # Then
+                self.assertFalse(makedirs_mock.called)
+                self.assertFalse(open_mock.called)
+
+
+class SessionCleanTests(unittest.TestCase):
+    """ Tests for the shared HTTP session of scrape.wiki. """
+    # pylint: disable=protected-access
+
+    def test_adapters(self):
+        """ Tests connections are pooled and failed requests retried. """
+        # Given
+        expected_retries = 5
+        expected_statuses = (429, 500, 502, 503, 504)
+
+        for prefix in ("http://", "https://"):
+            with self.subTest(prefix=prefix):
+                # When
+                adapter = wiki._SESSION.get_adapter(f"{prefix}example.com")
+
+                # Then
+                self.assertEqual(
+                    adapter.max_retries.total, expected_retries)
+                self.assertEqual(
+                    adapter.max_retries.status_forcelist, expected_statuses)
+                self.assertFalse(adapter.max_retries.raise_on_status)
+                self.assertEqual(
+                    adapter._pool_maxsize, config.GENERAL["MAX_WORKERS"])
+
+    def test_headers(self):
+        """ Tests compressed responses and keep-alive are requested. """
+        # Given
+        expected_headers = {
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            }
+
+        # When
+        headers = wiki._SESSION.headers
+
+        # Then
+        for key, value in expected_headers.items():
+            self.assertEqual(headers[key], value)
+        self.assertTrue(headers["User-Agent"].startswith("punter"))
+
+    @patch("punter.scrape.wiki._SESSION.close")
+    def test_close_session(self, close_mock):
+        """ Tests the shared session is closed. """
+        # When
+        close_session()
+
+        # Then
+        close_mock.assert_called_once_with()
+
+
+class ParseCachedTests(unittest.TestCase):
+    """ Tests for scrape.wiki._parse_cached. """
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        self.cache_file = "/path/to/cache/file"
+        self.parse_mock = Mock()
+        patches = ExitStack()
+        self.addCleanup(patches.close)
+        self.path_mock = patches.enter_context(
+            patch("punter.scrape.wiki.cache_path"))
+        self.read_mock = patches.enter_context(
+            patch("punter.scrape.wiki.read_json"))
+        self.write_mock = patches.enter_context(
+            patch("punter.scrape.wiki.write_json"))
+        self.path_mock.return_value = self.cache_file
+
+    def test_cached(self):
+        """ Tests stored result is used without parsing. """
+        # Given
+        expected_result = {"name": "Unit"}
+
+        self.read_mock.return_value = expected_result
+
+        # When
+        result = wiki._parse_cached(self.parse_mock, "<html>", "unit")
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.path_mock.assert_called_once_with(
+            f"unit:{wiki.PARSER_VERSION}:<html>",
+            config.PRISMATA_WIKI["PARSED_CACHE_PATH"])
+        self.read_mock.assert_called_once_with(self.cache_file)
+        self.assertFalse(self.parse_mock.called)
+        self.assertFalse(self.write_mock.called)
+
+    def test_not_cached(self):
+        """ Tests data is parsed and the result stored. """
+        # Given
+        expected_result = {"name": "Unit"}
+
+        self.read_mock.return_value = None
+        self.parse_mock.return_value = expected_result
+
+        # When
+        result = wiki._parse_cached(self.parse_mock, "<html>", "unit")
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.parse_mock.assert_called_once_with("<html>")
+        self.write_mock.assert_called_once_with(
+            self.cache_file, expected_result)
+
+    def test_read_error(self):
+        """ Tests unreadable cache files are parsed as a cache miss. """
+        # Given
+        expected_result = {"name": "Unit"}
+
+        self.read_mock.side_effect = PermissionError
+        self.parse_mock.return_value = expected_result
+
+        # When
+        result = wiki._parse_cached(self.parse_mock, "<html>", "unit")
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.parse_mock.assert_called_once_with("<html>")
+
+    def test_write_error(self):
+        """ Tests the result is kept when it can't be cached. """
+        # Given
+        expected_result = {"name": "Unit"}
+
+        self.read_mock.return_value = None
+        self.write_mock.side_effect = OSError("Read-only file system")
+        self.parse_mock.return_value = expected_result
+
+        # When
+        result = wiki._parse_cached(self.parse_mock, "<html>", "unit")
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.write_mock.assert_called_once_with(
+            self.cache_file, expected_result)
+
+    @patch("punter.scrape.wiki.PARSER_VERSION", 0)
+    def test_version(self):
+        """ Tests results of other parser versions use other files. """
+        # When
+        wiki._parse_cached(self.parse_mock, "<html>", "unit")
+
+        # Then
+        self.path_mock.assert_called_once_with(
+            "unit:0:<html>", config.PRISMATA_WIKI["PARSED_CACHE_PATH"])
+
+    def test_empty(self):
+        """ Tests empty data or results are not cached. """
+        for data, parsed in (("", {}), ("<html>", {})):
+            with self.subTest(data=data):
+                # Given
+                self.read_mock.return_value = None
+                self.parse_mock.return_value = parsed
+
+                # When
+                result = wiki._parse_cached(self.parse_mock, data, "unit")
+
+                # Then
+                self.assertEqual(result, parsed)
+                self.assertFalse(self.write_mock.called)
+
+
+class FetchUnitsDirtyTests(unittest.TestCase):
+    """ Tests error cases for scrape.wiki.fetch_units. """
+
+    def setUp(self):
+        self.base_url = config.PRISMATA_WIKI["BASE_URL"]
+        patches = ExitStack()
+        self.addCleanup(patches.close)
+        self.content_mock = patches.enter_context(
+            patch("punter.scrape.wiki.get_content"))
+        # Nothing parsed is cached yet
+        patches.enter_context(
+            patch("punter.scrape.wiki.read_json", return_value=None))
+        patches.enter_context(patch("punter.scrape.wiki.write_json"))
+
+    def test_invalid_url_config(self):
+        """ Tests invalid URL configuration. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_result = {}
+
+        self.content_mock.return_value = ""
+
+        # When
+        result = fetch_units()
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_called_once_with(
+            expected_url, save_file=False, use_cache=True)
+
+    @patch("punter.scrape.wiki.unit_table_to_dict")
+    def test_no_units(self, table_mock):
+        """ Tests fetch for all units returns nothing. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_data = "invalid content"
+        expected_result = {}
+
+        self.content_mock.return_value = expected_data
+        table_mock.return_value = expected_result
+
+        # When
+        result = fetch_units()
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_called_once_with(
+            expected_url, save_file=False, use_cache=True)
+        table_mock.assert_called_once_with(expected_data)
+
+
+class FetchUnitsCleanTests(unittest.TestCase):
+    """ Tests success cases for scrape.wiki.fetch_units. """
+
+    def setUp(self):
+        self.base_url = config.PRISMATA_WIKI["BASE_URL"]
+        patches = ExitStack()
+        self.addCleanup(patches.close)
+        self.content_mock = patches.enter_context(
+            patch("punter.scrape.wiki.get_content"))
+        self.table_mock = patches.enter_context(
+            patch("punter.scrape.wiki.unit_table_to_dict"))
+        self.unit_mock = patches.enter_context(
+            patch("punter.scrape.wiki.unit_to_dict"))
+        # Nothing parsed is cached yet
+        patches.enter_context(
+            patch("punter.scrape.wiki.read_json", return_value=None))
+        patches.enter_context(patch("punter.scrape.wiki.write_json"))
+
+    def test_no_details(self):
+        """ Tests fetch no details for units. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_raw_data = "some data"
+        expected_data = {
+            "unit1": {"key1": "val1", "links": {"path": "/unit1"}},
+            "unit2": {"key3": "val3", "links": {"path": "/unit2"}},
+            }
+        expected_result = expected_data
+
+        self.content_mock.side_effect = [
+            expected_raw_data,
+            "",
+            "",
+            ]
+        self.table_mock.return_value = expected_data
+        self.unit_mock.side_effect = [{}, {}]
+
+        # When
+        result = fetch_units()
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_has_calls([
+            call(expected_url, save_file=False, use_cache=True),
+            call(
+                f"{self.base_url}{expected_data['unit1']['links']['path']}",
+                save_file=False, use_cache=True),
+            call(
+                f"{self.base_url}{expected_data['unit2']['links']['path']}",
+                save_file=False, use_cache=True),
+            ], any_order=True)
+        self.table_mock.assert_called_once_with(expected_raw_data)
+        self.unit_mock.assert_has_calls([
+            call(""),
+            call(""),
+            ])
+
+    def test_base_url(self):
+        """ Tests pages are fetched from base_url when provided. """
+        # Given
+        base_url = "http://example.com"
+        expected_data = {"unit1": {"key1": "val1", "links": {"path": "/u1"}}}
+
+        self.content_mock.side_effect = ["some data", ""]
+        self.table_mock.return_value = expected_data
+        self.unit_mock.return_value = {}
+
+        # When
+        result = fetch_units(base_url=base_url)
+
+        # Then
+        self.assertEqual(result, expected_data)
+        self.content_mock.assert_has_calls([
+            call(
+                f"{base_url}{config.PRISMATA_WIKI['UNITS_PATH']}",
+                save_file=False, use_cache=True),
+            call(f"{base_url}/u1", save_file=False, use_cache=True),
+            ])
+
+    def test_details_all(self):
+        """ Tests fetch details for all units. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_raw_table = "raw table"
+        expected_raw_unit1 = "raw unit 1"
+        expected_raw_unit2 = "raw unit 2"
+        expected_table_data = {
+            "unit1": {
+                "key1": "val1",
+                "links": {"path": "/unit1"},
+                },
+            "unit2": {
+                "key3": "val3",
+                "links": {"path": "/unit2"},
+                },
+            }
+        expected_unit1 = {
+            "name": "unit1",
+            "keyX": "extra val 1",
+            "links": {"valW": "sub3"},
+            }
+        expected_unit2 = {
+            "name": "unit2",
+            "keyZ": "extra val 2",
+            "links": {"valY": "sub4"},
+            }
+        expected_data = {
+            "unit1": {
+                "key1": "val1",
+                "links": {"path": "/unit1", "valW": "sub3"},
+                "name": "unit1",
+                "keyX": "extra val 1",
+                },
+            "unit2": {
+                "key3": "val3",
+                "links": {"path": "/unit2", "valY": "sub4"},
+                "name": "unit2",
+                "keyZ": "extra val 2",
+                },
+            }
+        expected_result = expected_data
+
+        # Unit pages are fetched concurrently, so answer by argument
+        contents = {
+            expected_url: expected_raw_table,
+            f"{self.base_url}/unit1": expected_raw_unit1,
+            f"{self.base_url}/unit2": expected_raw_unit2,
+            }
+        units = {
+            expected_raw_unit1: expected_unit1,
+            expected_raw_unit2: expected_unit2,
+            }
+        self.content_mock.side_effect = lambda url, **kwargs: contents[url]
+        self.table_mock.return_value = expected_table_data
+        self.unit_mock.side_effect = units.get
+
+        # When
+        result = fetch_units()
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_has_calls([
+            call(expected_url, save_file=False, use_cache=True),
+            call(
+                f"{self.base_url}{expected_data['unit1']['links']['path']}",
+                save_file=False, use_cache=True),
+            call(
+                f"{self.base_url}{expected_data['unit2']['links']['path']}",
+                save_file=False, use_cache=True),
+            ], any_order=True)
+        self.table_mock.assert_called_once_with(expected_raw_table)
+        self.unit_mock.assert_has_calls([
+            call(expected_raw_unit1),
+            call(expected_raw_unit2),
+            ], any_order=True)
+
+    def test_details_some(self):
+        """ Tests fetch details for specific units. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_raw_table = "raw table"
+        expected_raw_unit1 = "raw unit 2"
+        expected_table_data = {
+            "unit1": {
+                "key1": "val1",
+                "links": {"path": "/unit1"},
+                },
+            "unit2": {
+                "key3": "val3",
+                "links": {"path": "/unit2"},
+                },
+            }
+        expected_unit1 = {
+            "name": "unit2",
+            "keyZ": "extra val 2",
+            "links": {"valY": "sub4"},
+            }
+        expected_data = {
+            "unit2": {
+                "key3": "val3",
+                "links": {"path": "/unit2", "valY": "sub4"},
+                "name": "unit2",
+                "keyZ": "extra val 2",
+                },
+            }
+        expected_result = expected_data
+
+        self.content_mock.side_effect = [
+            expected_raw_table,
+            expected_raw_unit1,
+            ]
+        self.table_mock.return_value = expected_table_data
+        self.unit_mock.side_effect = [expected_unit1]
+
+        # When
+        result = fetch_units(include=["unit2"])
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_has_calls([
+            call(expected_url, save_file=False, use_cache=True),
+            call(
+                f"{self.base_url}{expected_data['unit2']['links']['path']}",
+                save_file=False, use_cache=True),
+            ])
+        self.table_mock.assert_called_once_with(expected_raw_table)
+        self.unit_mock.assert_called_once_with(expected_raw_unit1)
+
+    def test_details_some_generator(self):
+        """ Tests fetch details for units from a generator. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_raw_table = "raw table"
+        expected_raw_unit1 = "raw unit 2"
+        expected_table_data = {
+            "unit1": {
+                "key1": "val1",
+                "links": {"path": "/unit1"},
+                },
+            "unit2": {
+                "key3": "val3",
+                "links": {"path": "/unit2"},
+                },
+            }
+        expected_unit1 = {
+            "name": "unit2",
+            "keyZ": "extra val 2",
+            "links": {"valY": "sub4"},
+            }
+        expected_data = {
+            "unit2": {
+                "key3": "val3",
+                "links": {"path": "/unit2", "valY": "sub4"},
+                "name": "unit2",
+                "keyZ": "extra val 2",
+                },
+            }
+        expected_result = expected_data
+
+        self.content_mock.side_effect = [
+            expected_raw_table,
+            expected_raw_unit1,
+            ]
+        self.table_mock.return_value = expected_table_data
+        self.unit_mock.side_effect = [expected_unit1]
+
+        # When
+        result = fetch_units(include=(name for name in ["unit2"]))
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_has_calls([
+            call(expected_url, save_file=False, use_cache=True),
+            call(
+                f"{self.base_url}{expected_data['unit2']['links']['path']}",
+                save_file=False, use_cache=True),
+            ])
+        self.table_mock.assert_called_once_with(expected_raw_table)
+        self.unit_mock.assert_called_once_with(expected_raw_unit1)
+
+    def test_no_cache(self):
+        """ Tests every page is fetched without the cache. """
+        # Given
+        expected_url = f"{self.base_url}{config.PRISMATA_WIKI['UNITS_PATH']}"
+        expected_raw_table = "raw table"
+        expected_raw_unit1 = "raw unit 1"
+        expected_data = {
+            "unit1": {"key1": "val1", "links": {"path": "/unit1"}},
+            }
+        expected_result = {
+            "unit1": {
+                "key1": "val1",
+                "links": {"path": "/unit1"},
+                "keyX": "extra val 1",
+                },
+            }
+
+        self.content_mock.side_effect = [
+            expected_raw_table,
+            expected_raw_unit1,
+            ]
+        self.table_mock.return_value = expected_data
+        self.unit_mock.side_effect = [{"keyX": "extra val 1"}]
+
+        # When
+        result = fetch_units(use_cache=False)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        self.content_mock.assert_has_calls([
+            call(expected_url, save_file=False, use_cache=False),
+            call(f"{self.base_url}/unit1", save_file=False, use_cache=False),
+            ])
+        self.unit_mock.assert_called_once_with(expected_raw_unit1)
+
+    @patch("punter.scrape.wiki.ThreadPoolExecutor", wraps=ThreadPoolExecutor)
+    def test_max_workers(self, executor_mock):
+        """ Tests unit pages are fetched by max_workers threads. """
+        # Given
+        expected_result = {}
+
+        self.content_mock.return_value = "raw table"
+        self.table_mock.return_value = {}
+
+        # When
+        result = fetch_units(max_workers=1)
+
+        # Then
+        self.assertEqual(result, expected_result)
+        executor_mock.assert_called_once_with(max_workers=1)
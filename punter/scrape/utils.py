@@ -1,13 +1,49 @@
 """ Utility functions for scrape module. """
+import json
+from contextlib import contextmanager
+from hashlib import sha1
+from mmap import (
+    ACCESS_READ,
+    mmap,
+    )
+from os import (
+    makedirs,
+    path,
+    remove,
+    replace,
+    )
 from random import uniform
-from time import sleep
+from threading import Lock
+from time import (
+    monotonic,
+    sleep,
+    time,
+    )
+from uuid import uuid4
 
-from typing import Tuple
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+    )
 
 from punter.scrape.config import GENERAL
 
 
-def delay(secs: Tuple[int, int] = GENERAL["THROTTLING_DELAY"]) -> float:
+# Earliest time (see time.monotonic) of the next request for each key
+_NEXT_REQUEST: Dict[str, float] = {}
+_NEXT_REQUEST_LOCK = Lock()
+
+
+def delay(
+        secs: Tuple[int, int] = GENERAL["THROTTLING_DELAY"],
+        _uniform: Callable[[float, float], float] = uniform,
+        _sleep: Callable[[float], None] = sleep,
+        ) -> float:
     """
     Wait for a random amount of time between two numbers (in seconds).
 
@@ -15,6 +51,10 @@ def delay(secs: Tuple[int, int] = GENERAL["THROTTLING_DELAY"]) -> float:
     ----------
     secs : tuple
         Range of seconds to wait for.
+    _uniform : function, optional
+        Random number generator, bound as a default for fast local lookup.
+    _sleep : function, optional
+        Sleep function, bound as a default for fast local lookup.
 
     Returns
     -------
@@ -22,6 +62,235 @@ def delay(secs: Tuple[int, int] = GENERAL["THROTTLING_DELAY"]) -> float:
         Amount of time waited.
 
     """
-    value: float = uniform(secs[0], secs[1])
-    sleep(value)
+    low, high = secs
+    value = _uniform(low, high)
+    _sleep(value)
     return value
+
+
+def throttle(
+        key: str,
+        secs: Tuple[int, int] = GENERAL["THROTTLING_DELAY"],
+        _uniform: Callable[[float, float], float] = uniform,
+        _sleep: Callable[[float], None] = sleep,
+        _monotonic: Callable[[], float] = monotonic,
+        ) -> float:
+    """
+    Wait until a request for key (usually a host) is allowed.
+
+    Consecutive requests for the same key are spaced by a random amount of
+    time in the secs range, counted from the previous request instead of
+    always sleeping for it. Safe to call from several threads, each caller
+    reserves its own slot.
+
+    Parameters
+    ----------
+    key : str
+        Value identifying who is being throttled.
+    secs : tuple
+        Range of seconds between requests.
+    _uniform : function, optional
+        Random number generator, bound as a default for fast local lookup.
+    _sleep : function, optional
+        Sleep function, bound as a default for fast local lookup.
+    _monotonic : function, optional
+        Clock function, bound as a default for fast local lookup.
+
+    Returns
+    -------
+    float
+        Amount of time waited.
+
+    """
+    low, high = secs
+    with _NEXT_REQUEST_LOCK:
+        now = _monotonic()
+        start = max(now, _NEXT_REQUEST.get(key, now))
+        _NEXT_REQUEST[key] = start + _uniform(low, high)
+    wait = start - now
+    if wait > 0:
+        _sleep(wait)
+    return wait
+
+
+def cache_path(key: str, directory: str) -> str:
+    """
+    Get the cache file path for a key (usually a URL).
+
+    Parameters
+    ----------
+    key : str
+        Value identifying the cached content.
+    directory : str
+        Directory where cache files are kept.
+
+    Returns
+    -------
+    str
+        Path of the cache file, named after the SHA1 digest of the key.
+
+    """
+    return path.join(directory, sha1(key.encode("utf-8")).hexdigest())
+
+
+def read_cached(
+        file_name: str, max_age: Optional[float] = None) -> Optional[str]:
+    """
+    Read content from a cache file.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the cache file.
+    max_age : float, optional
+        Maximum age (in seconds) of the file, older files are ignored.
+        Defaults to None (any age).
+
+    Returns
+    -------
+    str or None
+        Cached content, None if missing or too old.
+
+    """
+    try:
+        if max_age is not None and time() - path.getmtime(file_name) > max_age:
+            return None
+        with open(file_name, "r", encoding="utf-8") as cached_file:
+            return cached_file.read()
+    except OSError:
+        return None
+
+
+def read_text(file_name: str, mmap_size: int = 4096) -> str:
+    """
+    Read the (utf-8) text of a local file.
+
+    Files of at least mmap_size bytes are memory mapped and decoded
+    straight from the page cache, avoiding the intermediate read buffer.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to read.
+    mmap_size : int, defaults to 4096
+        Minimum size (in bytes) for a file to be memory mapped.
+
+    Returns
+    -------
+    str
+        Content of the file.
+
+    """
+    with open(file_name, "rb") as local_file:
+        if path.getsize(file_name) < mmap_size:
+            return local_file.read().decode("utf-8")
+        with mmap(local_file.fileno(), 0, access=ACCESS_READ) as mapped:
+            return str(mapped, "utf-8")  # Decodes the mapping, no bytes copy
+
+
+def write_cached(file_name: str, content: str) -> None:
+    """
+    Write content to a cache file atomically.
+
+    Content goes to a temporary file that replaces the target once written,
+    so readers never see a partially written file.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the cache file.
+    content : str
+        Content to cache.
+
+    """
+    makedirs(path.dirname(file_name), exist_ok=True)
+    with atomic_open(file_name, "w", encoding="utf-8") as cache_file:
+        cache_file.write(content)
+
+
+def read_json(file_name: str) -> Any:
+    """
+    Read an object from a JSON file.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the JSON file.
+
+    Returns
+    -------
+    any
+        Stored object, None if missing or not valid JSON.
+
+    Raises
+    ------
+    OSError
+        When the file exists but can't be read.
+
+    """
+    try:
+        with open(file_name, "r", encoding="utf-8") as json_file:
+            return json.load(json_file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_json(file_name: str, obj: Any) -> None:
+    """
+    Write an object to a JSON file atomically (see write_cached).
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the JSON file.
+    obj : any
+        Object to store (dicts, lists, strings, numbers, booleans, None).
+
+    Raises
+    ------
+    OSError
+        When the file can't be written.
+
+    """
+    makedirs(path.dirname(file_name), exist_ok=True)
+    with atomic_open(file_name, "w", encoding="utf-8") as json_file:
+        json.dump(obj, json_file, ensure_ascii=False, separators=(",", ":"))
+
+
+@contextmanager
+def atomic_open(
+        file_name: str, mode: str = "w", **kwargs: Any) -> Iterator[IO[Any]]:
+    """
+    Open a file for writing that only replaces file_name once complete.
+
+    Writes go to a temporary file next to file_name, which is moved into
+    place when the context exits cleanly and removed if it raises.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the file to write.
+    mode : str, defaults to "w"
+        Mode used to open the file (see open).
+    kwargs : dict
+        Any other arguments for open. Text modes default to utf-8 encoding.
+
+    Yields
+    ------
+    file object
+        The temporary file.
+
+    """
+    tmp_name = f"{file_name}.{uuid4().hex}.tmp"
+    # Not locale dependent, binary modes take no encoding
+    encoding = kwargs.pop("encoding", "utf-8")
+    if "b" in mode:
+        encoding = None
+    try:
+        with open(tmp_name, mode, encoding=encoding, **kwargs) as tmp_file:
+            yield tmp_file
+        replace(tmp_name, file_name)
+    except BaseException:
+        if path.exists(tmp_name):
+            remove(tmp_name)
+        raise
@@ -1,9 +1,12 @@
 """ Module for scraping prismata.gamepedia.com """
-import csv
-import json
 import os
 import re
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from datetime import date
+from functools import lru_cache
+from itertools import repeat
+from urllib.parse import urlparse
 from typing import (
     Any,
     Callable,
@@ -11,21 +14,39 @@ from typing import (
     Iterable,
     List,
     Mapping,
-    MutableMapping,
+    Optional,
     Union,
     )
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import (
     BeautifulSoup,
     element as bs4_element,
     )
+from bs4 import SoupStrainer  # type: ignore[attr-defined]
+from bs4.builder import builder_registry
 
-from punter.scrape.config import (
+from punter.scrape.config import (  # pylint: disable=no-name-in-module
+    GENERAL,
     LOGGER as logger,
     PRISMATA_WIKI,
     )
-from punter.scrape.utils import delay
+# Kept importable from wiki, where they used to be defined
+from punter.scrape.export import (  # pylint: disable=unused-import
+    export_units_csv,
+    export_units_json,
+    )
+from punter.scrape.utils import (
+    cache_path,
+    read_cached,
+    read_json,
+    read_text,
+    throttle,
+    write_cached,
+    write_json,
+    )
 
 
 # Map symbol titles into str abbreviation
@@ -39,8 +60,71 @@ TITLE_SYMBOL_MAP: Dict[str, str] = {
     "Ability": "Click",
     }
 
+# Version of the parsed results, part of their cache key (see _parse_cached).
+# Bump it when the output of the parsing functions changes.
+PARSER_VERSION = 1
+
+# Fastest parser available, lxml (C) unless it is not installed
+HTML_PARSER = "lxml" if builder_registry.lookup("lxml") else "html.parser"
+
+# Only build the parts of a page that are used (see parse_only)
+TABLE_STRAINER = SoupStrainer("table")  # Unit list is the first table
+BODY_STRAINER = SoupStrainer("body")  # Skips <head> scripts and styles
+
+# Shared by all requests, reuses connections to the same host (keep-alive)
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "User-Agent": "punter (+https://github.com/jeacaveo/punter)",
+    "Connection": "keep-alive",
+    "Accept-Encoding": "gzip, deflate",  # Pages are much smaller gzipped
+    })
+# Transient errors and throttling (429) are retried with backoff, keeping
+# the pooled connections. After the last retry the response is returned.
+_ADAPTER = HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=GENERAL["MAX_WORKERS"],
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False,
+        ),
+    )
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+# Response validators kept with cached pages, sent back as request headers
+# to revalidate them (a 304 Not Modified response has no body to download)
+_VALIDATORS = (
+    ("ETag", "If-None-Match"),
+    ("Last-Modified", "If-Modified-Since"),
+    )
+
+# String types included in the text of an element, see symbol_text
+_TEXT_TYPES = (bs4_element.NavigableString, bs4_element.CData)
+
+# Ordinal suffix of a day number (1st, 2nd, 3rd, 4th), see clean_change_log
+_ORDINAL_RE = re.compile(r"(?<=\d)(st|nd|rd|th)\b")
 
-def get_content(path: str, save_file: bool = False) -> str:
+# Markers checked before parsing, see unit_table_to_dict and unit_to_dict.
+# Only meant to reject pages quickly, the parsed tree has the final say.
+_TABLE_RE = re.compile(r"<table\b", re.IGNORECASE)
+_BOX_RE = re.compile(r"\bbox\b")
+
+# Month numbers by (English) name, see clean_change_log
+_MONTHS: Dict[str, int] = {
+    name: number for number, name in enumerate((
+        "January", "February", "March", "April", "May", "June", "July",
+        "August", "September", "October", "November", "December",
+        ), start=1)
+    }
+
+
+def get_content(
+        path: str,
+        save_file: bool = False,
+        use_cache: bool = False,
+        pretty: bool = False,
+        ) -> str:
     """
     Get HTML for path.
 
@@ -49,7 +133,14 @@ def get_content(path: str, save_file: bool = False) -> str:
     path : str
         Valid path to get content from.
     save_file : bool, defaults to False
-        Saves a file to configed save path if not reading from a file.
+        Saves a file to configed save path if not reading from a file,
+        named after the URL path (https://site/Unit to SAVE_PATH/Unit).
+    use_cache : bool, defaults to False
+        Serve URLs from the on-disk cache while it is fresh (see
+        GENERAL["CACHE_TTL"]), revalidate it with a conditional request
+        once it expires, and fall back to a stale copy if the request fails.
+    pretty : bool, defaults to False
+        Prettify the HTML saved with save_file (parses it one more time).
 
     Returns
     -------
@@ -58,25 +149,178 @@ def get_content(path: str, save_file: bool = False) -> str:
 
     """
     read_file = not path.startswith("http")
+    cache_file = (
+        cache_path(path, PRISMATA_WIKI["CACHE_PATH"])
+        if use_cache and not read_file else "")
+    if cache_file:
+        cached = read_cached(cache_file, max_age=GENERAL["CACHE_TTL"])
+        if cached is not None:
+            if save_file:
+                _save_content(path, cached, pretty=pretty)
+            return cached
+
+    not_modified, stale = False, None
     if read_file and os.path.isfile(path):
-        with open(path, "r") as local_file:
-            content = local_file.read()
-            is_valid = True
+        content = read_text(path)
+        is_valid = True
     else:
-        response = requests.get(path)
-        content = str(response.content)
-        is_valid = response.status_code == 200
+        # Revalidate an expired copy instead of downloading it again.
+        # Validators are only sent when there is a body to keep on a 304.
+        stale = read_cached(cache_file) if cache_file else None
+        conditional = None
+        if stale is not None:
+            with suppress(OSError):  # Unreadable, sent as a plain request
+                conditional = read_json(f"{cache_file}.headers")
+        throttle(urlparse(path).netloc)
+        try:
+            response = _SESSION.get(
+                path, timeout=GENERAL["REQUEST_TIMEOUT"],
+                headers=conditional or {})
+            content = response.text  # Decoded as the server says
+            is_valid = response.status_code == 200
+            not_modified = response.status_code == 304
+        except requests.RequestException:
+            if not cache_file:
+                raise
+            content, is_valid = "", False
 
     if not is_valid:
-        return ""
+        content = _cached_fallback(path, cache_file, stale, not_modified)
+        if save_file and content:
+            _save_content(path, content, pretty=pretty)
+        return content
+
+    if cache_file:
+        _write_cache(cache_file, content, response.headers)
 
     if save_file and not read_file:
-        with open(path, "w") as out_file:
-            out_file.write(BeautifulSoup(content, "html.parser").prettify())
+        _save_content(path, content, response.content, pretty)
     return content
 
 
-def clean(element: bs4_element, cast: Callable[[Any], Any] = str) -> Any:
+def _save_content(
+        path: str, content: str, raw: Optional[bytes] = None,
+        pretty: bool = False) -> None:
+    """
+    Save the content of a URL to PRISMATA_WIKI["SAVE_PATH"].
+
+    Files are named after the URL path (https://site/Unit to SAVE_PATH/Unit),
+    so SAVE_PATH can be used as BASE_URL. Paths that would end up outside
+    of SAVE_PATH (../) aren't saved.
+
+    Parameters
+    ----------
+    path : str
+        URL the content belongs to.
+    content : str
+        HTML content.
+    raw : bytes, optional
+        Content as received, written as is when provided (and not pretty).
+    pretty : bool, defaults to False
+        Prettify the HTML before saving it.
+
+    """
+    name = os.path.normpath(urlparse(path).path.lstrip("/") or "index")
+    if name == os.curdir or name.split(os.sep)[0] == os.pardir:
+        logger.warning("Not saving, path outside SAVE_PATH: %s", path)
+        return
+    save_name = os.path.join(PRISMATA_WIKI["SAVE_PATH"], name)
+    os.makedirs(os.path.dirname(save_name), exist_ok=True)
+    if pretty:
+        with open(save_name, "w", encoding="utf-8") as out_file:
+            out_file.write(BeautifulSoup(content, HTML_PARSER).prettify())
+    else:
+        # Bytes as received when available, no need to encode content again
+        with open(save_name, "wb") as out_file:
+            out_file.write(content.encode("utf-8") if raw is None else raw)
+
+
+def _write_cache(
+        cache_file: str, content: str, headers: Mapping[str, str]) -> None:
+    """
+    Cache the content of a path with its validators, see get_content.
+
+    Caching is best effort, write errors are logged and ignored.
+
+    Parameters
+    ----------
+    cache_file : str
+        Cache file of the path.
+    content : str
+        Content to cache.
+    headers : dict
+        Response headers, validators in them are kept for revalidation.
+
+    """
+    try:
+        write_cached(cache_file, content)
+        write_json(f"{cache_file}.headers", {
+            request_header: headers[header]
+            for header, request_header in _VALIDATORS
+            if header in headers})
+    except OSError as error:
+        logger.warning("Can't write cache %s: %s", cache_file, error)
+
+
+def _cached_fallback(
+        path: str, cache_file: str, stale: Optional[str], not_modified: bool
+        ) -> str:
+    """
+    Get the cached content of a path when its request gives no new content.
+
+    Parameters
+    ----------
+    path : str
+        Path that was requested.
+    cache_file : str
+        Cache file of the path, empty when the cache isn't used.
+    stale : str or None
+        Content of the (expired) cache file, None if there is none.
+    not_modified : bool
+        Server answered 304 Not Modified, so the cached copy is still valid.
+
+    Returns
+    -------
+    str
+        Cached content, empty if nothing is cached.
+
+    """
+    if stale is None:
+        return ""
+    if not_modified:
+        with suppress(OSError):
+            os.utime(cache_file)  # Fresh for another CACHE_TTL
+    else:
+        logger.warning("Request failed, using stale cache for: %s", path)
+    return stale
+
+
+def close_session() -> None:
+    """ Close the connections kept open by the shared HTTP session. """
+    _SESSION.close()
+
+
+def clean_text(text: str) -> str:
+    """
+    Collapse whitespace in text into single spaces.
+
+    Parameters
+    ----------
+    text : str
+        Text to clean.
+
+    Returns
+    -------
+    str
+        Text without leading/trailing whitespace and with every inner
+        whitespace run (newlines included) replaced by one space.
+
+    """
+    # split (no args) drops every whitespace run, leading/trailing included
+    return " ".join(text.split())
+
+
+def clean(element: bs4_element.Tag, cast: Callable[[Any], Any] = str) -> Any:
     """
     Clean item provided.
 
@@ -93,11 +337,17 @@ def clean(element: bs4_element, cast: Callable[[Any], Any] = str) -> Any:
         Returns content of Tag of the type from the cast function.
 
     """
-    if element.div:
-        element = element.div
+    # A Tag is always truthy, so the div is only looked up once
+    element = element.div or element
     # element.img is for fields that only contain an image and no text
-    value = element.img or element.text.strip()
-    return cast(value)
+    img = element.img
+    if img:
+        return cast(img)
+    # Most cells hold a single string, skip joining all descendants for them
+    string = element.string
+    if string is not None and type(string) in _TEXT_TYPES:
+        return cast(string.strip())
+    return cast(element.text.strip())
 
 
 def unit_table_to_dict(
@@ -154,46 +404,57 @@ def unit_table_to_dict(
         }
 
     """
-    soup = BeautifulSoup(data, "html.parser")
-    table = soup.table("tr") if soup.table else []
+    # Cheap scan, rejects non table pages without parsing them
+    if not _TABLE_RE.search(data):
+        logger.warning("Invalid data format for unit table: %s", data[:100])
+        return {}
 
-    return {
-        clean(unit[0]): {  # unit name
-            "name": clean(unit[0]),
+    soup = BeautifulSoup(data, HTML_PARSER, parse_only=TABLE_STRAINER)
+    first_table = soup.table  # Looked up once
+    # Direct rows only, lxml/html.parser may wrap them in a tbody
+    body = first_table and (
+        first_table.find("tbody", recursive=False) or first_table)
+    table = body("tr", recursive=False) if body else []
+
+    clean_cell = clean  # Local name, called for every cell
+    units: Dict[str, Any] = {}
+    for row in table:
+        unit = row("td", recursive=False)  # Only the cells of this row
+        if not unit:
+            continue
+        name = clean_cell(unit[0])  # Computed once, used as key and value
+        units[name] = {
+            "name": name,
             "costs": {
-                "gold": clean(unit[3], int),
-                "energy": clean(unit[4], int),
-                "green": clean(unit[5], int),
-                "blue": clean(unit[6], int),
-                "red": clean(unit[7], int),
+                "gold": clean_cell(unit[3], int),
+                "energy": clean_cell(unit[4], int),
+                "green": clean_cell(unit[5], int),
+                "blue": clean_cell(unit[6], int),
+                "red": clean_cell(unit[7], int),
                 },
             "stats": {
-                "attack": int(clean(unit[15]) or 0),
-                "health": clean(unit[10], int),
+                "attack": int(clean_cell(unit[15]) or 0),
+                "health": clean_cell(unit[10], int),
                 },
             "attributes": {
-                "supply": clean(unit[8], int),
-                "frontline": clean(unit[11], bool),
-                "fragile": clean(unit[12], bool),
-                "blocker": clean(unit[13], bool),
-                "prompt": clean(unit[14], bool),
-                "stamina": clean(unit[16], int),
-                "lifespan": clean(unit[19], int),
-                "build_time": clean(unit[9], int),
-                "exhaust_turn": clean(unit[17], int),
-                "exhaust_ability": clean(unit[18], int),
+                "supply": clean_cell(unit[8], int),
+                "frontline": clean_cell(unit[11], bool),
+                "fragile": clean_cell(unit[12], bool),
+                "blocker": clean_cell(unit[13], bool),
+                "prompt": clean_cell(unit[14], bool),
+                "stamina": clean_cell(unit[16], int),
+                "lifespan": clean_cell(unit[19], int),
+                "build_time": clean_cell(unit[9], int),
+                "exhaust_turn": clean_cell(unit[17], int),
+                "exhaust_ability": clean_cell(unit[18], int),
                 },
             "links": {
                 "path": unit[0].a.get("href"),
                 },
-            "type": clean(unit[1], int),
-            "unit_spell": clean(unit[2]),
+            "type": clean_cell(unit[1], int),
+            "unit_spell": clean_cell(unit[2]),
             }
-        for unit in map(lambda row: row("td"), table)  # type: ignore
-        if unit
-        # Ignoring typing in map, all uses of the clean function return Any
-        # This means that it can't match the return types for this function
-        }
+    return units
 
 
 def clean_symbols(element: bs4_element.Tag) -> bs4_element.Tag:
@@ -209,16 +470,60 @@ def clean_symbols(element: bs4_element.Tag) -> bs4_element.Tag:
     -------
     bs4.element.Tag
         Returns the same element provided as parameter,
-        but with all symbol links replaced.
+        but with all symbol links (see TITLE_SYMBOL_MAP) replaced.
 
     """
+    symbols = TITLE_SYMBOL_MAP  # Local name, looked up for every link
     for icon in element("a"):
         title = icon.get("title") or icon.text
-        symbol = TITLE_SYMBOL_MAP.get(title, title)
-        icon.replace_with(symbol)
+        # Other links already show their label, no need to replace them
+        if title in symbols:
+            icon.replace_with(symbols[title])
     return element
 
 
+def symbol_text(element: bs4_element.Tag) -> str:
+    """
+    Get the text of element, with symbol links as text.
+
+    Same result as clean_symbols(element).get_text(), but the strings are
+    collected in one walk and element is left as it was.
+
+    Parameters
+    ----------
+    element : bs4.element.Tag
+        Tag object from BeautifulSoup4 library.
+
+    Returns
+    -------
+    str
+        Text of element, symbol links (see TITLE_SYMBOL_MAP) replaced.
+
+    """
+    parts: List[str] = []
+    _symbol_strings(element, TITLE_SYMBOL_MAP, parts)
+    return "".join(parts)
+
+
+def _symbol_strings(
+        element: bs4_element.Tag,
+        symbols: Mapping[str, str],
+        parts: List[str]) -> None:
+    """ Collect the strings of element into parts, see symbol_text. """
+    for child in element.children:
+        if isinstance(child, bs4_element.Tag):
+            if child.name == "a":
+                title = child.get("title") or child.text
+                if title in symbols:
+                    parts.append(symbols[str(title)])
+                    continue
+            _symbol_strings(child, symbols, parts)
+        # Same string types as get_text (no comments, doctypes, etc.)
+        elif (isinstance(child, bs4_element.NavigableString)
+              and type(child) in _TEXT_TYPES):
+            parts.append(child)
+
+
 def clean_changes(element: bs4_element.Tag) -> List[str]:
     """
     Clean changes list into readable format.
@@ -236,12 +541,36 @@ def clean_changes(element: bs4_element.Tag) -> List[str]:
     """
     clean_values = []
     for item in element.ul("li"):
-        item = clean_symbols(item)
-        content = item.get_text().replace("\n", "")
-        clean_values.append(" ".join(content.split()))
+        clean_values.append(clean_text(symbol_text(item)))
     return clean_values
 
 
+@lru_cache(maxsize=512)
+def _parse_day(day: str) -> str:
+    """
+    Convert a change log day into ISO format.
+
+    Cached, the same (patch) days show up in the change log of many units.
+
+    Parameters
+    ----------
+    day : str
+        Day as written in the wiki, ie: "October 31st, 1984".
+
+    Returns
+    -------
+    str
+        Day in ISO format, ie: "1984-10-31".
+
+    """
+    # Split by hand, strptime("%B %d, %Y") is much slower (and locale aware)
+    month, number, year = _ORDINAL_RE.sub("", day).replace(",", "").split()
+    # Unknown months map to 0, which date rejects (ValueError)
+    return date(
+        int(year), _MONTHS.get(month.capitalize(), 0), int(number)
+        ).isoformat()
+
+
 def clean_change_log(change_log: bs4_element.Tag) -> Dict[str, List[str]]:
     """
     Clean change log element into readable format.
@@ -269,11 +598,13 @@ def clean_change_log(change_log: bs4_element.Tag) -> Dict[str, List[str]]:
     change_log = change_log and change_log.find_next("ul")
     change_log = change_log and change_log.find_all("li", recursive=False)
     result = {}
+    parse_day, changes = _parse_day, clean_changes  # Local names
     for change in change_log or []:
-        day = list(change.stripped_strings)[0]
-        day = re.sub(r"(?<=\d)(st|nd|rd|th)\b", '', day)
-        day = datetime.strptime(day, "%B %d, %Y").date().isoformat()
-        result[day] = clean_changes(change)
+        # Only the first string (the day) is needed
+        day = next(change.stripped_strings, "")
+        if not day:
+            continue
+        result[parse_day(day)] = changes(change)
     return result
 
 
@@ -309,23 +640,28 @@ def unit_to_dict(data: str) -> Dict[str, Dict[str, List[str]]]:
         }
 
     """
-    soup = BeautifulSoup(data, "html.parser")
-    if not soup:
-        logger.warning("Invalid data format for unit: %s", data)
+    # A soup is always truthy, sniff for the unit box before parsing instead
+    if not _BOX_RE.search(data):
+        logger.warning("Invalid data format for unit: %s", data[:100])
         return {}
 
-    abilities = soup.select_one("div.box")("div")[-1]
-    change_log = soup.select_one("#Change_log")
+    soup = BeautifulSoup(data, HTML_PARSER, parse_only=BODY_STRAINER)
+
+    # find skips CSS selector parsing, only the panel needs a selector
+    box = soup.find("div", class_="box")
+    if box is None:  # "box" was somewhere else in the page
+        logger.warning("Invalid data format for unit: %s", data[:100])
+        return {}
+    abilities = box("div")[-1]
+    change_log = soup.find(id="Change_log")
 
     result = {
-        "name": clean(soup.select_one("div.title")),
-        "abilities": " ".join(
-            clean_symbols(abilities).get_text().replace("\n", "").split()
-            ),
+        "name": clean(soup.find("div", class_="title")),
+        "abilities": clean_text(symbol_text(abilities)),
         "change_history": clean_change_log(change_log),
         "links": {
-            "path": soup.select_one("#ca-view").a.get("href"),
-            "image": (soup.select_one(".thumbimage") or {}).get("src"),
+            "path": soup.find(id="ca-view").a.get("href"),
+            "image": (soup.find(class_="thumbimage") or {}).get("src"),
             "panel": (soup.select_one("p > a.image > img") or {}).get("src"),
             },
         "position": "Middle Far Right",
@@ -335,196 +671,86 @@ def unit_to_dict(data: str) -> Dict[str, Dict[str, List[str]]]:
     return result
 
 
-def export_units_json(
-        data: Dict[str, Dict[str, Union[str, int]]],
-        file_name: str = "units.json"
-        ) -> Dict[str, str]:
+def _parse_cached(
+        parse: Callable[[str], Dict[str, Any]], data: str, kind: str
+        ) -> Dict[str, Any]:
     """
-    Save data into .json format/file.
+    Parse data, reusing the result stored on disk for the same data.
+
+    Results are stored as JSON in PRISMATA_WIKI["PARSED_CACHE_PATH"], named
+    after kind, PARSER_VERSION and the content (see cache_path), so unchanged
+    pages skip parsing and results of older parsers are not reused.
+    The cache is best effort, files that can't be read or written are
+    logged and data is parsed as usual.
 
     Parameters
     ----------
-    data : dict
-        Data to export. See Example for expected format.
-    file_name : str, defaults to  "units.json"
-        Path of file to save.
+    parse : function
+        Function that parses data, ie: unit_to_dict.
+    data : str
+        Content to parse.
+    kind : str
+        Kind of content, keeps results of different parse functions apart.
 
     Returns
     -------
     dict
-
-    Example
-    -------
-    input:
-        {
-            "Unit Name":
-                {
-                    "name": "Unit name",
-                    "costs": {
-                        "gold": 1,
-                        "energy": 0,
-                        "green": 1,
-                        "blue": 0,
-                        "red": 1,
-                        },
-                    "stats": {
-                        "attack": 1,
-                        "health": 1,
-                        },
-                    "attributes": {
-                        "supply": 1,
-                        "frontline": True,
-                        "fragile": False,
-                        "blocker": True,
-                        "prompt": False,
-                        "stamina": 0,
-                        "lifespan": 0,
-                        "build_time": 0,
-                        "exhaust_turn": 0,
-                        "exhaust_ability": 0,
-                        },
-                    "links": {
-                        "path": "/Unit_Name",
-                        },
-                    "type": 1,
-                    "unit_spell": "Unit|Spell",
-                },
-            ...
-        }
+        Result of parse(data).
 
     """
-    data_json = json.dumps(
-        data, sort_keys=True, indent=4, separators=(",", ": "))
-
-    with open(file_name, "w") as out_file:
-        out_file.write(data_json)
-
-    logger.info("Data exported to (JSON): %s", file_name)
-    return {"message": "Success"}
+    if not data:
+        return parse(data)
+    cache_file = cache_path(
+        f"{kind}:{PARSER_VERSION}:{data}", PRISMATA_WIKI["PARSED_CACHE_PATH"])
+    try:
+        result: Optional[Dict[str, Any]] = read_json(cache_file)
+    except OSError as error:
+        logger.warning("Can't read parsed cache %s: %s", cache_file, error)
+        result = None
+    if result is None:
+        result = parse(data)
+        if result:
+            try:
+                write_json(cache_file, result)
+            except OSError as error:
+                logger.warning(
+                    "Can't write parsed cache %s: %s", cache_file, error)
+    return result
 
 
-def export_units_csv(
-        data: Dict[str, MutableMapping[str, Mapping[str, Iterable[str]]]],
-        file_name: str = "units.csv"
-        ) -> Dict[str, str]:
+def _fetch_unit(
+        url: str, save_source: bool = False, use_cache: bool = True
+        ) -> Dict[str, Any]:
     """
-    Save data into .csv format/file.
+    Get details for a single unit.
 
     Parameters
     ----------
-    data : dict
-        Data to export. See Example for expected format.
-    file_name : str, defaults to  "units.csv"
-        Path of file to save.
+    url : str
+        Path of the unit page.
+    save_source : bool, defaults to False
+        Wether to save the fetched html into a file on disk.
+    use_cache : bool, defaults to True
+        Wether to use the on-disk caches, see get_content and _parse_cached.
 
     Returns
     -------
     dict
-
-    Example
-    -------
-    input:
-        {
-            "Unit Name":
-                {
-                    "abilities": "",
-                    "attributes": {
-                        "blocker": false,
-                        "build_time": 0,
-                        "exhaust_ability": 0,
-                        "exhaust_turn": 0,
-                        "fragile": false,
-                        "frontline": false,
-                        "lifespan": 0,
-                        "prompt": false,
-                        "stamina": 0,
-                        "supply": 0,
-                    },
-                    "change_history": {
-                        "Month 00st, YEAR": [
-                                "",
-                                ...
-                            ],
-                        ...
-                        },
-                    "costs": {
-                        "blue": 0,
-                        "energy": 0,
-                        "gold": 0,
-                        "green": 0,
-                        "red": 0,
-                    },
-                    "links": {
-                        "image": "",
-                        "panel": "",
-                        "path": "",
-                    },
-                    "name": "",
-                    "position": "",
-                    "stats": {
-                        "attack": 0,
-                        "health": 0,
-                    },
-                    "type": 0,
-                    "unit_spell": "",
-                },
-                ...
-        }
-
-    output:
-    False, {"message": "Error message"}
-    True, {"message": "Success message"}
+        Unit details, see unit_to_dict.
 
     """
-    try:
-        flat_data_list = []
-        for _, val in data.items():
-            unit: MutableMapping[str, Any] = {}
-            unit.update(val.pop("attributes"))
-            unit.update(val.pop("costs"))
-            unit.update(val.pop("links"))
-            unit.update(val.pop("stats"))
-            unit.update({
-                "change_history":
-                "|".join([
-                    f"{day}, {' '.join(change)}"
-                    for day, change in val.pop("change_history").items()
-                    ])
-                })
-            unit.update(val)
-            flat_data_list.append(unit)
-
-        with open(file_name, "w") as out_file:
-            # For ordering purposes, Using explcit list
-            # instead of flat_data_list[0].keys()
-            headers = [
-                'name', 'supply', 'type', 'position', 'unit_spell',
-                'gold', 'blue', 'red', 'green', 'energy',
-                'attack', 'health', 'blocker', 'fragile',
-                'frontline', 'prompt', 'lifespan', 'stamina',
-                'build_time', 'exhaust_ability', 'exhaust_turn',
-                'abilities', 'path', 'image', 'panel',
-                'change_history',
-                ]
-            writer = csv.DictWriter(out_file, fieldnames=headers)
-            writer.writeheader()
-            for unit in flat_data_list:
-                writer.writerow(unit)
-    except AttributeError:
-        message = "Invalid format (nested data)."
-        logger.error("Error exporting CSV: %s", message)
-        return {"message": message}
-    except KeyError:
-        message = "Invalid format (missing key)."
-        logger.error("Error exporting CSV: %s", message)
-        return {"message": message}
-
-    logger.info("Data exported to (CSV): %s", file_name)
-    return {"message": "Success"}
+    content = get_content(url, save_file=save_source, use_cache=use_cache)
+    if use_cache:
+        return _parse_cached(unit_to_dict, content, "unit")
+    return unit_to_dict(content)
 
 
 def fetch_units(
-        include: Iterable[str] = ("all",), save_source: bool = False
+        include: Iterable[str] = ("all",),
+        save_source: bool = False,
+        max_workers: int = GENERAL["MAX_WORKERS"],
+        use_cache: bool = True,
+        base_url: Optional[str] = None,
         ) -> Dict[str, Dict[str, Union[Dict[str, int], List[str], str, int]]]:
     """
     Get information for Prismata units.
@@ -540,6 +766,14 @@ def fetch_units(
         Name of units to fetch. Defaults to 'all'.
     save_source : bool, defaults to False
         Wether to save the fetched html into a file on disk.
+    max_workers : int, defaults to GENERAL["MAX_WORKERS"]
+        Unit pages fetched at the same time.
+    use_cache : bool, defaults to True
+        Wether to use the on-disk caches (see get_content and
+        _parse_cached), False always fetches and parses every page.
+    base_url : str, optional
+        URL of the site, or path of saved source files, to scrape from.
+        Defaults to PRISMATA_WIKI["BASE_URL"].
 
     Returns
     -------
@@ -547,7 +781,11 @@ def fetch_units(
         HTML content.
 
     """
-    base_url = PRISMATA_WIKI["BASE_URL"]
+    if base_url is None:
+        base_url = PRISMATA_WIKI["BASE_URL"]
+    # Consumed once (include may be a generator), then O(1) lookups
+    include = tuple(include)
+    include_set = frozenset(include)
 
     logger.info(
         "Fetching\nFrom: %s\nUnits: %s\nSaving sources? %s\n",
@@ -555,26 +793,30 @@ def fetch_units(
 
     # Get general information for all units
     content = get_content(
-        f"{base_url}{PRISMATA_WIKI['UNITS_PATH']}", save_file=save_source)
+        f"{base_url}{PRISMATA_WIKI['UNITS_PATH']}",
+        save_file=save_source, use_cache=use_cache)
 
     # Filter out units based on include param
-    units: Dict[str, Any] = {
-        key: val
-        for key, val in unit_table_to_dict(content).items()
-        if "all" in include or key in include
-        }
-
-    # Get details for each unit
-    for _, value in units.items():
-        delay()
-        content = get_content(
-            f"{base_url}{value['links']['path']}", save_file=save_source)
-        unit_detail = unit_to_dict(content)
-        # Flatten nested dicts (only one level)
-        for key in set(value.keys()).intersection(unit_detail.keys()):
-            if isinstance(unit_detail[key], dict):
-                value[key].update(unit_detail.pop(key))
-        value.update(unit_detail)
+    units: Dict[str, Any] = (
+        _parse_cached(unit_table_to_dict, content, "units") if use_cache
+        else unit_table_to_dict(content))
+    if "all" not in include_set:
+        units = {
+            key: val for key, val in units.items() if key in include_set}
+
+    # Get details for each unit, pages are fetched concurrently
+    urls = [base_url + value["links"]["path"] for value in units.values()]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        details = executor.map(
+            _fetch_unit, urls, repeat(save_source), repeat(use_cache))
+        # Merge in the main thread, map keeps the order of units
+        for value, unit_detail in zip(units.values(), details):
+            # Flatten nested dicts (only one level)
+            # Set of the shared keys, so popping while looping is safe
+            for key in unit_detail.keys() & value.keys():
+                if isinstance(unit_detail[key], dict):
+                    value[key].update(unit_detail.pop(key))
+            value.update(unit_detail)
 
     logger.info("Total units fetched: %s", len(units))
     return units
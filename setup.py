@@ -20,10 +20,11 @@ setuptools.setup(
         "GNU Affero General Public License v3 or later (AGPLv3+)",
         "Operating System :: OS Independent",
         ],
-    python_requires=">=3.6",
-    install_requires=["beautifulsoup4", "requests"],
+    python_requires=">=3.7",  # Module __getattr__ (PEP 562)
+    install_requires=["beautifulsoup4", "lxml", "requests"],
     extras_require={
         "dev": ["pycodestyle", "pylint", "mypy"],
-        "test": ["mock", "coverage"],
+        "test": ["coverage"],
+        "json": ["orjson>=3"],
         },
     )